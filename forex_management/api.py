@@ -0,0 +1,187 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+import functools
+import random
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import now
+
+from forex_management.forex_management.doctype.transaction.transaction import (
+	insert_batch,
+	validate_for_batch,
+)
+
+MAX_BATCH_SIZE = 500
+# attempts of a write that deadlocks or times out waiting for a row lock
+MAX_WRITE_ATTEMPTS = 5
+# seconds, the wait before retry n is drawn from [0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**n)]
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 2
+
+
+def retry_on_lock_conflict(fn):
+	"""Run `fn` again when it deadlocks or times out waiting for a row lock.
+
+	The DB transaction is rolled back before each retry, so `fn` must redo everything
+	it wrote since the last commit. The wait between attempts is jittered, so writers
+	that collided once do not collide again in step.
+	"""
+
+	@functools.wraps(fn)
+	def wrapper(*args, **kwargs):
+		for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+			try:
+				return fn(*args, **kwargs)
+			except (frappe.QueryDeadlockError, frappe.QueryTimeoutError):
+				frappe.db.rollback()
+				frappe.clear_messages()
+				if attempt == MAX_WRITE_ATTEMPTS:
+					raise
+				time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)))
+
+	return wrapper
+
+
+@frappe.whitelist(methods=["POST"])
+def savedocs(doc: str, action: str):
+	"""Save, submit or update a document from the form, see `frappe.desk.form.save.savedocs`.
+
+	Transactions are retried when they hit a deadlock or a lock wait timeout, so a
+	trade submitted from the form at peak load is not lost to a lock conflict.
+	"""
+	from frappe.desk.form import save
+
+	if frappe.parse_json(doc).get("doctype") == "Transaction":
+		return retry_on_lock_conflict(save.savedocs)(doc, action)
+	return save.savedocs(doc, action)
+
+
+@frappe.whitelist(methods=["POST", "PUT"])
+def submit(doc: str | dict):
+	"""Submit a document, see `frappe.client.submit`. Transactions are retried on lock conflicts."""
+	from frappe import client
+
+	if frappe.parse_json(doc).get("doctype") == "Transaction":
+		return retry_on_lock_conflict(client.submit)(doc)
+	return client.submit(doc)
+
+
+@frappe.whitelist(methods=["POST"])
+def submit_transactions(transactions: str | list) -> list[dict]:
+	"""Insert and submit a batch of trades in a single request and DB transaction.
+
+	Every item is a Transaction dict with a client generated `idempotency_key`. An item
+	whose key was already used returns the transaction it created the first time, so a
+	terminal can resend the whole batch after a timeout without booking anything twice.
+
+	The items are validated one by one, then the valid trades and their keys are written
+	with one multi-row INSERT each, and the trading summaries and currency positions are
+	updated once per customer and currency. The batch commits once, and is retried as a
+	whole if it hits a deadlock or a lock wait timeout.
+
+	Returns one `{idempotency_key, status, name, error}` dict per item, in request order,
+	where status is Submitted, Duplicate or Failed. A failed item does not affect the others.
+	"""
+	frappe.has_permission("Transaction", "submit", throw=True)
+
+	transactions = frappe.parse_json(transactions)
+	if len(transactions) > MAX_BATCH_SIZE:
+		frappe.throw(_("A batch can hold at most {0} transactions.").format(MAX_BATCH_SIZE))
+
+	keys = [item.get("idempotency_key") for item in transactions]
+	if not all(keys):
+		frappe.throw(_("Every transaction needs an idempotency_key."))
+	if len(set(keys)) != len(keys):
+		frappe.throw(_("Idempotency keys must be unique within a batch."))
+
+	for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+		try:
+			return _submit_batch(transactions)
+		except Exception as e:
+			# a resend of the same batch claimed some of the keys first; once it commits,
+			# the next attempt finds them and returns their trades as duplicates
+			if not (e.args and frappe.db.is_duplicate_entry(e)) or attempt == MAX_WRITE_ATTEMPTS:
+				raise
+			frappe.db.rollback()
+			frappe.clear_messages()
+
+
+@retry_on_lock_conflict
+def _submit_batch(transactions: list[dict]) -> list[dict]:
+	keys = [item["idempotency_key"] for item in transactions]
+
+	# one query per lookup for the whole batch instead of one per item
+	submitted = dict(
+		frappe.get_all(
+			"Transaction Request",
+			filters={"name": ["in", keys]},
+			fields=["name", "transaction"],
+			as_list=True,
+		)
+	)
+	customers = set(
+		frappe.get_all(
+			"Customer",
+			filters={"name": ["in", {item.get("customer") for item in transactions}]},
+			pluck="name",
+		)
+	)
+	currencies = set(
+		frappe.get_all(
+			"FXCurrency",
+			filters={"name": ["in", {item.get("currency") for item in transactions}]},
+			pluck="name",
+		)
+	)
+
+	results = {}
+	batch = {}
+	for item in transactions:
+		key = item["idempotency_key"]
+		if key in submitted:
+			results[key] = _get_result(key, "Duplicate", name=submitted[key])
+		elif item.get("customer") not in customers:
+			results[key] = _get_result(
+				key, "Failed", error=_("Customer {0} not found").format(item.get("customer"))
+			)
+		elif item.get("currency") not in currencies:
+			results[key] = _get_result(
+				key, "Failed", error=_("Currency {0} not found").format(item.get("currency"))
+			)
+		else:
+			fields = {fieldname: value for fieldname, value in item.items() if fieldname != "idempotency_key"}
+			doc = frappe.get_doc({**fields, "doctype": "Transaction", "docstatus": 1})
+			try:
+				validate_for_batch(doc, list(batch.values()))
+			except (frappe.QueryDeadlockError, frappe.QueryTimeoutError):
+				# the whole DB transaction is gone, leave it to the retry
+				raise
+			except Exception as e:
+				frappe.clear_messages()
+				results[key] = _get_result(key, "Failed", error=str(e))
+			else:
+				batch[key] = doc
+
+	if batch:
+		# claim the keys before booking the trades, so a concurrent resend of the same
+		# batch fails on the unique key instead of submitting the trades a second time
+		timestamp, user = now(), frappe.session.user
+		frappe.db.bulk_insert(
+			"Transaction Request",
+			fields=["name", "creation", "modified", "owner", "modified_by", "idempotency_key", "transaction"],
+			values=[(key, timestamp, timestamp, user, user, key, doc.name) for key, doc in batch.items()],
+		)
+		insert_batch(list(batch.values()))
+		frappe.db.commit()
+
+		for key, doc in batch.items():
+			results[key] = _get_result(key, "Submitted", name=doc.name)
+
+	return [results[key] for key in keys]
+
+
+def _get_result(key: str, status: str, name: str | None = None, error: str | None = None) -> dict:
+	return {"idempotency_key": key, "status": status, "name": name, "error": error}
@@ -0,0 +1,190 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Archival of old Transaction rows and queries that span all stored transactions.
+
+Submitted and cancelled transactions older than the retention window are moved
+from `tabTransaction` to `tabTransaction Archive` in small batches. Reports go
+through `get_all_transactions`, which reads the archive only when the date filter
+reaches back past the newest archived row, so date-filtered reports over recent
+periods only scan the live table.
+
+MariaDB RANGE partitioning is not an option here: every unique key of a
+partitioned table must contain the partitioning column, and `name` is the
+primary key of every DocType table.
+"""
+
+import re
+import time
+
+import frappe
+from frappe.utils import add_days, get_datetime, now_datetime
+
+from forex_management.period_close import split_closed_days
+
+# days a submitted transaction stays in the live table, override with the
+# `transaction_retention_days` site config key
+DEFAULT_RETENTION_DAYS = 730
+ARCHIVE_BATCH_SIZE = 1000
+# pause between batches, so archiving never holds up counter traffic for long
+ARCHIVE_BATCH_PAUSE = 0.5
+ARCHIVE_MAX_RUNTIME = 20 * 60
+ARCHIVED_UNTIL_KEY = "forex_management:transactions_archived_until"
+
+AGGREGATE_FIELD = re.compile(r"^\s*(SUM|COUNT|MAX|MIN)\s*\(.*\)\s+as\s+(\w+)\s*$", re.IGNORECASE)
+
+
+def archive_old_transactions():
+	"""Move transactions older than the retention window to Transaction Archive."""
+	retention_days = frappe.conf.get("transaction_retention_days") or DEFAULT_RETENTION_DAYS
+	cutoff = add_days(now_datetime(), -retention_days)
+	columns = ", ".join(f"`{column}`" for column in get_archive_columns())
+	started = time.monotonic()
+
+	while time.monotonic() - started < ARCHIVE_MAX_RUNTIME:
+		names = frappe.get_all(
+			"Transaction",
+			filters={"docstatus": ["!=", 0], "date_and_time": ["<", cutoff]},
+			order_by="date_and_time asc",
+			limit=ARCHIVE_BATCH_SIZE,
+			pluck="name",
+		)
+		if not names:
+			break
+
+		frappe.db.sql(
+			f"""
+			insert into `tabTransaction Archive` ({columns})
+			select {columns} from `tabTransaction` where name in %(names)s
+			""",
+			{"names": names},
+		)
+		frappe.db.delete("Transaction", {"name": ["in", names]})
+		frappe.db.commit()
+		frappe.cache.delete_value(ARCHIVED_UNTIL_KEY)
+
+		if len(names) < ARCHIVE_BATCH_SIZE:
+			break
+		time.sleep(ARCHIVE_BATCH_PAUSE)
+
+
+def get_archive_columns() -> list[str]:
+	archive_columns = set(frappe.db.get_table_columns("Transaction Archive"))
+	return [column for column in frappe.db.get_table_columns("Transaction") if column in archive_columns]
+
+
+def get_archived_until():
+	"""Return the time of the newest archived transaction, or None if nothing is archived."""
+	return frappe.cache.get_value(
+		ARCHIVED_UNTIL_KEY,
+		generator=lambda: frappe.db.get_value("Transaction Archive", {}, "max(date_and_time)"),
+	)
+
+
+def includes_archive(filters: list[list]) -> bool:
+	"""Return whether archived rows can match the list-style Transaction `filters`."""
+	archived_until = get_archived_until()
+	if not archived_until:
+		return False
+
+	for fieldname, operator, value in filters:
+		if fieldname != "date_and_time":
+			continue
+		if operator == "between":
+			value = value[0]
+		elif operator not in (">", ">="):
+			continue
+		if get_datetime(value) > get_datetime(archived_until):
+			return False
+
+	return True
+
+
+def get_all_transactions(
+	filters: dict,
+	fields: list[str],
+	group_by: str | None = None,
+	order_by: str | None = None,
+	limit: int | None = None,
+) -> list[frappe._dict]:
+	"""Same as `frappe.db.get_all("Transaction", ...)` over all submitted transactions.
+
+	Whole closed days in range are read from their Trading Day Totals, the rest from
+	Transaction and, if the range reaches back that far, Transaction Archive.
+	Aggregates (SUM, MAX, MIN with an alias) are combined across these sources,
+	grouped on `group_by`; other fields keep the value of the first row of each group.
+	COUNT(*) counts total rows on closed days, use SUM(trade_count) there instead.
+	"""
+	sources = get_transaction_sources(filters)
+	if len(sources) == 1:
+		doctype, source_filters = sources[0]
+		return frappe.db.get_all(
+			doctype,
+			filters=source_filters,
+			fields=fields,
+			group_by=group_by,
+			order_by=order_by,
+			limit=limit,
+		)
+
+	group_keys = [key.strip() for key in (group_by or "").split(",") if key.strip()]
+	# the group columns are needed to merge the groups of all sources
+	query_fields = fields + [key for key in group_keys if key not in fields]
+
+	rows = []
+	for doctype, source_filters in sources:
+		rows += frappe.db.get_all(doctype, filters=source_filters, fields=query_fields, group_by=group_by)
+
+	aggregates = {}
+	for field in fields:
+		if match := AGGREGATE_FIELD.match(field):
+			aggregates[match.group(2)] = match.group(1).upper()
+
+	if aggregates:
+		rows = merge_groups(rows, aggregates, group_keys)
+
+	if order_by:
+		for clause in reversed(order_by.split(",")):
+			fieldname, _, direction = clause.strip().partition(" ")
+			rows.sort(key=lambda row: row.get(fieldname) or 0, reverse=direction.lower() == "desc")
+
+	return rows[:limit] if limit else rows
+
+
+def get_transaction_sources(filters: dict) -> list[tuple[str, list]]:
+	"""Return the `(doctype, filters)` pairs that together hold the transactions matching `filters`."""
+	closed_filters, open_filters = split_closed_days(filters)
+
+	sources = []
+	if closed_filters:
+		sources.append(("Trading Day Total", closed_filters))
+
+	for source_filters in open_filters:
+		sources.append(("Transaction", [*source_filters, ["docstatus", "=", 1]]))
+		if includes_archive(source_filters):
+			sources.append(("Transaction Archive", [*source_filters, ["docstatus", "=", 1]]))
+
+	return sources
+
+
+def merge_groups(rows: list[dict], aggregates: dict[str, str], group_by: list[str]) -> list[frappe._dict]:
+	groups = {}
+	for row in rows:
+		key = tuple(row.get(fieldname) for fieldname in group_by)
+		if key not in groups:
+			groups[key] = frappe._dict(row)
+			continue
+
+		group = groups[key]
+		for fieldname, function in aggregates.items():
+			values = [value for value in (group.get(fieldname), row.get(fieldname)) if value is not None]
+			if not values:
+				continue
+			if function in ("SUM", "COUNT"):
+				group[fieldname] = sum(values)
+			elif function == "MAX":
+				group[fieldname] = max(values)
+			else:
+				group[fieldname] = min(values)
+
+	return list(groups.values())
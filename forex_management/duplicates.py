@@ -0,0 +1,281 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Duplicate detection for Customers.
+
+Every customer gets a few blocking keys in Customer Match Key: a phonetic key of
+their name, their normalized phone number and their normalized email address.
+Only customers sharing a key are ever compared, so checking a new customer costs
+one indexed lookup plus a handful of comparisons, and `cluster_customers` scores
+each block on its own instead of every pair of customers.
+
+Pairs scoring at least `DUPLICATE_THRESHOLD` are linked, and linked customers
+form clusters, each listed in Customer Duplicate against its main customer for
+review. `merge_customers` folds a duplicate into the main customer.
+"""
+
+import itertools
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import frappe
+from frappe import _
+from frappe.utils import get_url_to_form, now
+
+from forex_management.velocity import get_counter_key
+
+DUPLICATE_THRESHOLD = 0.85
+NAME_WEIGHT = 0.6
+PHONE_WEIGHT = 0.2
+EMAIL_WEIGHT = 0.2
+# keys shared by more customers than this, like a common name, are too coarse to block on
+MAX_BLOCK_SIZE = 200
+# national significant number length, "+251 91 123 4567" and "0911234567" share the last 9 digits
+PHONE_DIGITS = 9
+CUSTOMER_FIELDS = ["name", "first_name", "last_name", "email_address", "phone_number"]
+
+SOUNDEX_CODES = {
+	**dict.fromkeys("bfpv", "1"),
+	**dict.fromkeys("cgjkqsxz", "2"),
+	**dict.fromkeys("dt", "3"),
+	"l": "4",
+	**dict.fromkeys("mn", "5"),
+	"r": "6",
+}
+
+
+def get_name_tokens(customer) -> list[str]:
+	"""Return the lowercase ASCII words of the customer's name, accents and punctuation removed."""
+	name = f"{customer.get('first_name') or ''} {customer.get('last_name') or ''}"
+	name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+	return re.findall(r"[a-z]+", name)
+
+
+def normalize_phone(phone: str | None) -> str | None:
+	digits = re.sub(r"\D", "", phone or "")
+	return digits[-PHONE_DIGITS:] if len(digits) >= 7 else None
+
+
+def normalize_email(email: str | None) -> str | None:
+	email = (email or "").strip().lower()
+	local, at, domain = email.partition("@")
+	if not local or not at:
+		return None
+
+	local = local.split("+")[0]
+	if domain in ("gmail.com", "googlemail.com"):
+		local, domain = local.replace(".", ""), "gmail.com"
+	return f"{local}@{domain}"
+
+
+def soundex(word: str) -> str:
+	codes = [word[0].upper()]
+	previous = SOUNDEX_CODES.get(word[0])
+	for char in word[1:]:
+		code = SOUNDEX_CODES.get(char)
+		if code and code != previous:
+			codes.append(code)
+		# h and w do not separate two letters with the same code
+		if char not in "hw":
+			previous = code
+	return "".join(codes)[:4].ljust(4, "0")
+
+
+def get_match_keys(customer) -> list[tuple[str, str]]:
+	"""Return the `(key_type, match_key)` blocking keys of `customer`."""
+	keys = []
+	if tokens := get_name_tokens(customer):
+		# first and last word only, in either order, so a middle name or swapped names still match
+		keys.append(("Name", "-".join(sorted({soundex(tokens[0]), soundex(tokens[-1])}))))
+	if phone := normalize_phone(customer.get("phone_number")):
+		keys.append(("Phone", phone))
+	if email := normalize_email(customer.get("email_address")):
+		keys.append(("Email", email))
+	return keys
+
+
+def score_pair(customer, other) -> float:
+	"""Return how likely two customers are the same person, from 0 to 1.
+
+	A weighted average of name similarity and phone and email equality, over the
+	fields both customers have, so a shared phone alone does not make relatives
+	duplicates and a customer without contact details is judged on the name.
+	"""
+	name_similarity = SequenceMatcher(
+		None, " ".join(sorted(get_name_tokens(customer))), " ".join(sorted(get_name_tokens(other)))
+	).ratio()
+	score, weight = NAME_WEIGHT * name_similarity, NAME_WEIGHT
+
+	for normalize, fieldname, field_weight in (
+		(normalize_phone, "phone_number", PHONE_WEIGHT),
+		(normalize_email, "email_address", EMAIL_WEIGHT),
+	):
+		value, other_value = normalize(customer.get(fieldname)), normalize(other.get(fieldname))
+		if value and other_value:
+			score += field_weight * (value == other_value)
+			weight += field_weight
+
+	return score / weight
+
+
+def update_match_keys(customer):
+	frappe.db.delete("Customer Match Key", {"customer": customer.name})
+	insert_match_keys([customer])
+
+
+def insert_match_keys(customers: list):
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Customer Match Key",
+		fields=["name", "creation", "modified", "owner", "modified_by", "customer", "key_type", "match_key"],
+		values=[
+			(frappe.generate_hash(), timestamp, timestamp, user, user, customer.name, key_type, match_key)
+			for customer in customers
+			for key_type, match_key in get_match_keys(customer)
+		],
+	)
+
+
+def rebuild_match_keys():
+	frappe.db.delete("Customer Match Key")
+	insert_match_keys(frappe.get_all("Customer", fields=CUSTOMER_FIELDS))
+
+
+def find_duplicates(customer) -> list[tuple[str, float]]:
+	"""Return `(customer name, score)` of the likely duplicates of `customer`, best first."""
+	keys = [match_key for _key_type, match_key in get_match_keys(customer)]
+	if not keys:
+		return []
+
+	candidates = frappe.get_all(
+		"Customer Match Key",
+		filters={"match_key": ["in", keys], "customer": ["!=", customer.name or ""]},
+		pluck="customer",
+		distinct=True,
+		limit=MAX_BLOCK_SIZE,
+	)
+	if not candidates:
+		return []
+
+	duplicates = [
+		(other.name, score)
+		for other in frappe.get_all("Customer", filters={"name": ["in", candidates]}, fields=CUSTOMER_FIELDS)
+		if (score := score_pair(customer, other)) >= DUPLICATE_THRESHOLD
+	]
+	return sorted(duplicates, key=lambda duplicate: -duplicate[1])
+
+
+def warn_about_duplicates(customer):
+	if not (duplicates := find_duplicates(customer)):
+		return
+
+	links = ", ".join(
+		f'<a href="{get_url_to_form("Customer", name)}">{frappe.bold(name)}</a>'
+		for name, _score in duplicates[:5]
+	)
+	frappe.msgprint(
+		_("This customer looks like an existing one: {0}").format(links),
+		title=_("Possible Duplicate"),
+		indicator="orange",
+	)
+
+
+def cluster_customers(threshold: float = DUPLICATE_THRESHOLD):
+	"""Cluster all customers into likely duplicates and list them in Customer Duplicate.
+
+	Each block of customers sharing a match key is scored pairwise, so the cost grows
+	with the number of customers times the (capped) block size rather than with the
+	square of the number of customers. Pairs marked Ignored stay ignored.
+	"""
+	rebuild_match_keys()
+	customers = {
+		customer.name: customer
+		for customer in frappe.get_all(
+			"Customer", fields=[*CUSTOMER_FIELDS, "trade_count", "creation"], order_by="creation asc"
+		)
+	}
+
+	blocks = defaultdict(list)
+	for key in frappe.get_all("Customer Match Key", fields=["match_key", "customer"]):
+		blocks[key.match_key].append(key.customer)
+
+	ignored = {
+		frozenset(pair)
+		for pair in frappe.get_all(
+			"Customer Duplicate",
+			filters={"status": "Ignored"},
+			fields=["customer", "duplicate_of"],
+			as_list=True,
+		)
+	}
+
+	parent = {}
+
+	def find(name):
+		while parent.get(name, name) != name:
+			parent[name] = parent.get(parent[name], parent[name])
+			name = parent[name]
+		return name
+
+	scores, scored = {}, set()
+	for members in blocks.values():
+		if not 1 < len(members) <= MAX_BLOCK_SIZE:
+			continue
+
+		for pair in itertools.combinations(sorted(members), 2):
+			if pair in scored or frozenset(pair) in ignored:
+				continue
+			scored.add(pair)
+
+			score = score_pair(customers[pair[0]], customers[pair[1]])
+			if score >= threshold:
+				parent[find(pair[1])] = find(pair[0])
+				for name in pair:
+					scores[name] = max(scores.get(name, 0), score)
+
+	clusters = defaultdict(list)
+	for name in scores:
+		clusters[find(name)].append(name)
+
+	frappe.db.delete("Customer Duplicate", {"status": "Open"})
+	for members in clusters.values():
+		# keep the customer with the most trades, the oldest one on a tie
+		main = max(
+			members,
+			key=lambda name: (customers[name].trade_count or 0, -customers[name].creation.timestamp()),
+		)
+		for name in members:
+			if name != main and frozenset((name, main)) not in ignored:
+				frappe.get_doc(
+					{
+						"doctype": "Customer Duplicate",
+						"customer": name,
+						"duplicate_of": main,
+						"score": scores[name] * 100,
+						"status": "Open",
+					}
+				).insert(ignore_permissions=True)
+
+
+@frappe.whitelist(methods=["POST"])
+def merge_customers(customer: str, into: str):
+	"""Merge `customer` into `into`: move all their transactions and records, then delete `customer`."""
+	from forex_management.forex_management.doctype.customer.customer import rebuild_trading_summaries
+
+	if customer == into:
+		frappe.throw(_("A customer cannot be merged into itself."))
+	frappe.has_permission("Customer", "delete", doc=customer, throw=True)
+	frappe.has_permission("Customer", "write", doc=into, throw=True)
+
+	# rows about `customer` itself would point from `into` to `into` after the rename
+	frappe.db.delete("Customer Match Key", {"customer": customer})
+	frappe.db.delete("Customer Duplicate", {"customer": customer})
+	frappe.db.delete("Customer Duplicate", {"customer": into, "duplicate_of": customer})
+
+	frappe.rename_doc("Customer", customer, into, merge=True, ignore_permissions=True)
+
+	rebuild_trading_summaries(customer=into)
+	frappe.cache.delete(get_counter_key(into))
+	return into
@@ -0,0 +1,78 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import get_datetime, getdate
+
+from forex_management.valuation import apply_trade, replay_position
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestCurrencyPosition(UnitTestCase):
+	"""
+	Unit tests for Currency Position.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_average_cost_blends_and_realizes(self):
+		position, average_cost, realized = apply_trade(0, 0, 100, 130)
+		self.assertEqual((position, average_cost, realized), (100, 130, 0))
+
+		position, average_cost, realized = apply_trade(position, average_cost, 100, 140)
+		self.assertEqual((position, average_cost, realized), (200, 135, 0))
+
+		position, average_cost, realized = apply_trade(position, average_cost, -50, 145)
+		self.assertEqual((position, average_cost, realized), (150, 135, 500))
+
+	def test_flipping_position_starts_new_cost(self):
+		position, average_cost, realized = apply_trade(100, 130, -150, 140)
+		self.assertEqual((position, average_cost, realized), (-50, 140, 1000))
+
+	def test_replay_from_last_close_matches_full_replay(self):
+		trades = [
+			frappe._dict(currency="USD", transaction_type=transaction_type, amount=amount, exchange_rate=rate)
+			for transaction_type, amount, rate in [
+				("Buy", 100, 130),
+				("Buy", 100, 140),
+				("Sell", 150, 145),
+				("Buy", 30, 150),
+			]
+		]
+
+		def get_trades(trades):
+			return lambda doctype, **kwargs: trades if doctype == "Transaction" else []
+
+		with patch("frappe.get_all", get_trades(trades)):
+			full = replay_position("USD")
+
+		with patch("frappe.get_all", get_trades(trades[:2])):
+			closing = frappe._dict(replay_position("USD"), snapshot_date=getdate("2025-04-07"))
+
+		with (
+			patch("forex_management.valuation.get_closing_position", return_value=closing),
+			patch("frappe.get_all", side_effect=get_trades(trades[2:])) as get_all,
+		):
+			self.assertEqual(replay_position("USD", from_last_close=True), full)
+
+		# only the trades after the closed day are read
+		self.assertIn(
+			["date_and_time", ">=", get_datetime("2025-04-08")], get_all.call_args.kwargs["filters"]
+		)
+
+
+class IntegrationTestCurrencyPosition(IntegrationTestCase):
+	"""
+	Integration tests for Currency Position.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	pass
@@ -1,8 +1,16 @@
 # Copyright (c) 2025, Natnael Abrham and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
+from frappe.utils import flt, get_datetime, sbool
+
+from forex_management.archive import merge_groups
+from forex_management.duplicates import update_match_keys, warn_about_duplicates
+from forex_management.rates import get_amount_etb
+
+TRADING_SUMMARY_FIELDS = ["trade_count", "total_turnover_etb", "last_trade_at"]
+MATCH_KEY_FIELDS = ["first_name", "last_name", "email_address", "phone_number"]
 
 
 class Customer(Document):
@@ -15,6 +23,263 @@ class Customer(Document):
 
     def before_save(self):
         self.full_name = self.get_full_name()
+        self.keep_trading_summary()
 
     def autoname(self):
         self.name = self.get_full_name()
+
+    def validate(self):
+        if self.is_new():
+            warn_about_duplicates(self)
+
+    def on_update(self):
+        if any(self.has_value_changed(fieldname) for fieldname in MATCH_KEY_FIELDS):
+            update_match_keys(self)
+
+    def on_trash(self):
+        frappe.db.delete("Customer Match Key", {"customer": self.name})
+        frappe.db.delete("Customer Duplicate", {"customer": self.name})
+        frappe.db.delete("Customer Duplicate", {"duplicate_of": self.name})
+
+    def keep_trading_summary(self):
+        # the summary is maintained by Transaction submit/cancel, never by the form;
+        # a form opened before the latest trade must not write back stale totals
+        if self.is_new():
+            return
+
+        self.update(frappe.db.get_value("Customer", self.name, TRADING_SUMMARY_FIELDS, as_dict=True) or {})
+
+    def get_context(self, context):
+        context.trading_summary = get_trading_summaries([self.name], with_currencies=True).get(self.name)
+
+
+def update_trading_summary(transaction, sign: int = 1):
+    """Apply `transaction` to its customer's cached totals. `sign=-1` reverses a cancelled trade."""
+    apply_trading_totals(get_trading_totals([transaction], sign))
+
+    # a cancelled trade may have been the latest, so the time is recomputed from the
+    # remaining trades
+    if sign < 0:
+        update_last_trade_at(transaction.customer, transaction.currency)
+
+
+def update_trading_summaries(transactions: list):
+    """Apply a batch of submitted `transactions`, with one update per customer and currency."""
+    apply_trading_totals(get_trading_totals(transactions))
+
+
+def get_trading_totals(transactions: list, sign: int = 1) -> list[dict]:
+    """Return the totals of `transactions` per customer and currency, sorted by both."""
+    totals = {}
+    for transaction in transactions:
+        amount = flt(transaction.amount) * sign
+        row = totals.setdefault(
+            (transaction.customer, transaction.currency),
+            {
+                "customer": transaction.customer,
+                "currency": transaction.currency,
+                "trade_count": 0,
+                "turnover": 0.0,
+                "amount_bought": 0.0,
+                "amount_sold": 0.0,
+                "date_and_time": None,
+            },
+        )
+        row["trade_count"] += sign
+        row["turnover"] += get_amount_etb(transaction) * sign
+        row["amount_bought"] += amount if transaction.transaction_type == "Buy" else 0
+        row["amount_sold"] += amount if transaction.transaction_type == "Sell" else 0
+        row["date_and_time"] = max(
+            filter(None, [row["date_and_time"], get_datetime(transaction.date_and_time)])
+        )
+
+    return [totals[key] for key in sorted(totals)]
+
+
+def apply_trading_totals(totals: list[dict]):
+    """Add rows of `get_trading_totals` to the Customer and Customer Trading Summary totals."""
+    for values in totals:
+        # a new trade can only move the last trade time forward, a cancelled one leaves
+        # it to `update_last_trade_at`
+        if values["trade_count"] > 0:
+            last_trade_at = "greatest(coalesce(last_trade_at, %(date_and_time)s), %(date_and_time)s)"
+        else:
+            last_trade_at = "last_trade_at"
+
+        # lock the customer row first, so concurrent trades of one customer queue up here
+        # instead of racing on the insert of a new currency row
+        frappe.db.get_value("Customer", values["customer"], "name", for_update=True)
+
+        frappe.db.sql(
+            f"""
+            update `tabCustomer`
+            set trade_count = trade_count + %(trade_count)s,
+                total_turnover_etb = total_turnover_etb + %(turnover)s,
+                last_trade_at = {last_trade_at}
+            where name = %(customer)s
+            """,
+            values,
+        )
+
+        summary_name = frappe.db.get_value(
+            "Customer Trading Summary",
+            {"customer": values["customer"], "currency": values["currency"]},
+        )
+        if summary_name:
+            frappe.db.sql(
+                f"""
+                update `tabCustomer Trading Summary`
+                set trade_count = trade_count + %(trade_count)s,
+                    turnover_etb = turnover_etb + %(turnover)s,
+                    amount_bought = amount_bought + %(amount_bought)s,
+                    amount_sold = amount_sold + %(amount_sold)s,
+                    last_trade_at = {last_trade_at}
+                where name = %(name)s
+                """,
+                {**values, "name": summary_name},
+            )
+        else:
+            frappe.get_doc(
+                {
+                    "doctype": "Customer Trading Summary",
+                    "customer": values["customer"],
+                    "currency": values["currency"],
+                    "trade_count": values["trade_count"],
+                    "turnover_etb": values["turnover"],
+                    "amount_bought": values["amount_bought"],
+                    "amount_sold": values["amount_sold"],
+                    "last_trade_at": values["date_and_time"] if values["trade_count"] > 0 else None,
+                }
+            ).insert(ignore_permissions=True)
+
+
+def update_last_trade_at(customer: str, currency: str):
+    """Recompute the last trade time of `customer` overall and in `currency`."""
+    filters = {"customer": customer, "docstatus": 1}
+    last_trade_at = get_last_trade_at(filters)
+    frappe.db.set_value("Customer", customer, "last_trade_at", last_trade_at, update_modified=False)
+
+    filters["currency"] = currency
+    last_trade_at = get_last_trade_at(filters)
+    frappe.db.set_value(
+        "Customer Trading Summary",
+        {"customer": customer, "currency": currency},
+        "last_trade_at",
+        last_trade_at,
+        update_modified=False,
+    )
+
+
+def get_last_trade_at(filters: dict):
+    """Return the latest `date_and_time` matching `filters`, live or archived."""
+    return max(
+        (
+            last_trade_at
+            for doctype in ("Transaction Archive", "Transaction")
+            if (last_trade_at := frappe.db.get_value(doctype, filters, "max(date_and_time)"))
+        ),
+        default=None,
+    )
+
+
+@frappe.whitelist()
+def get_trading_summaries(customers: str | list, with_currencies: bool = False) -> dict:
+    """Return the cached trading summary of each customer, keyed by customer name.
+
+    Reads the maintained totals only, so the cost per customer does not depend on
+    how many transactions they have.
+    """
+    frappe.has_permission("Customer", throw=True)
+
+    customers = frappe.parse_json(customers)
+    if isinstance(customers, str):
+        customers = [customers]
+
+    summaries = {
+        row.pop("name"): row
+        for row in frappe.get_all(
+            "Customer",
+            filters={"name": ["in", customers]},
+            fields=["name", *TRADING_SUMMARY_FIELDS],
+        )
+    }
+
+    if sbool(with_currencies):
+        for summary in summaries.values():
+            summary["currencies"] = []
+
+        for row in frappe.get_all(
+            "Customer Trading Summary",
+            filters={"customer": ["in", list(summaries)]},
+            fields=[
+                "customer",
+                "currency",
+                "amount_bought",
+                "amount_sold",
+                "turnover_etb",
+                "trade_count",
+                "last_trade_at",
+            ],
+            order_by="turnover_etb desc",
+        ):
+            summaries[row.pop("customer")]["currencies"].append(row)
+
+    return summaries
+
+
+def rebuild_trading_summaries(customer: str | None = None):
+    """Recompute the trading summary of `customer`, or of every customer, from submitted transactions.
+
+    Reads Transaction Archive too, so archived trades stay in the lifetime totals.
+    """
+    customer_filters = {"customer": customer} if customer else {}
+    frappe.db.delete("Customer Trading Summary", customer_filters)
+    frappe.db.sql(
+        """
+        update `tabCustomer` set trade_count = 0, total_turnover_etb = 0, last_trade_at = null
+        where %(customer)s is null or name = %(customer)s
+        """,
+        {"customer": customer},
+    )
+
+    totals = []
+    for doctype in ("Transaction Archive", "Transaction"):
+        totals += frappe.db.get_all(
+            doctype,
+            filters={"docstatus": 1, **customer_filters},
+            fields=[
+                "customer",
+                "currency",
+                "COUNT(*) as trade_count",
+                "SUM(amount_etb) as turnover_etb",
+                "SUM(IF(transaction_type = 'Buy', amount, 0)) as amount_bought",
+                "SUM(IF(transaction_type = 'Sell', amount, 0)) as amount_sold",
+                "MAX(date_and_time) as last_trade_at",
+            ],
+            group_by="customer, currency",
+        )
+
+    totals = merge_groups(
+        totals,
+        {
+            "trade_count": "COUNT",
+            "turnover_etb": "SUM",
+            "amount_bought": "SUM",
+            "amount_sold": "SUM",
+            "last_trade_at": "MAX",
+        },
+        ["customer", "currency"],
+    )
+
+    for row in totals:
+        frappe.get_doc({"doctype": "Customer Trading Summary", **row}).insert(ignore_permissions=True)
+        frappe.db.sql(
+            """
+            update `tabCustomer`
+            set trade_count = trade_count + %(trade_count)s,
+                total_turnover_etb = total_turnover_etb + %(turnover_etb)s,
+                last_trade_at = greatest(coalesce(last_trade_at, %(last_trade_at)s), %(last_trade_at)s)
+            where name = %(customer)s
+            """,
+            row,
+        )
@@ -0,0 +1,24 @@
+// Copyright (c) 2025, Natnael Abrham and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Customer Duplicate", {
+	refresh(frm) {
+		if (frm.is_new()) return;
+
+		frm.add_custom_button(__("Merge into {0}", [frm.doc.duplicate_of]), () => {
+			frappe.confirm(
+				__("Move all records of {0} to {1} and delete {0}?", [
+					frm.doc.customer.bold(),
+					frm.doc.duplicate_of.bold(),
+				]),
+				() =>
+					frappe
+						.call("forex_management.duplicates.merge_customers", {
+							customer: frm.doc.customer,
+							into: frm.doc.duplicate_of,
+						})
+						.then((r) => frappe.set_route("Form", "Customer", r.message))
+			);
+		});
+	},
+});
@@ -0,0 +1,52 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from forex_management.duplicates import DUPLICATE_THRESHOLD, get_match_keys, score_pair
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestCustomerDuplicate(UnitTestCase):
+	"""
+	Unit tests for Customer Duplicate.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_spelling_variants_share_keys_and_match(self):
+		customer = {
+			"first_name": "Abebe",
+			"last_name": "Kebede",
+			"phone_number": "+251 91 123 4567",
+			"email_address": "A.Bebe+fx@gmail.com",
+		}
+		variant = {
+			"first_name": "Abebe",
+			"last_name": "Kebbede",
+			"phone_number": "0911234567",
+			"email_address": "abebe@gmail.com",
+		}
+
+		self.assertEqual(get_match_keys(customer), get_match_keys(variant))
+		self.assertGreaterEqual(score_pair(customer, variant), DUPLICATE_THRESHOLD)
+
+	def test_shared_phone_alone_is_not_a_duplicate(self):
+		customer = {"first_name": "Abebe", "last_name": "Kebede", "phone_number": "0911234567"}
+		relative = {"first_name": "Alemu", "last_name": "Kebede", "phone_number": "0911234567"}
+
+		self.assertLess(score_pair(customer, relative), DUPLICATE_THRESHOLD)
+
+
+class IntegrationTestCustomerDuplicate(IntegrationTestCase):
+	"""
+	Integration tests for Customer Duplicate.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	pass
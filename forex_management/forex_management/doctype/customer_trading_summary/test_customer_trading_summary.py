@@ -0,0 +1,150 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import get_datetime, today
+
+from forex_management.forex_management.doctype.customer.customer import (
+	get_trading_totals,
+	rebuild_trading_summaries,
+)
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+TEST_CURRENCY = "Summary Test Dollar (STD)"
+
+
+class UnitTestCustomerTradingSummary(UnitTestCase):
+	"""
+	Unit tests for Customer Trading Summary.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_batch_totals_are_grouped_by_customer_and_currency(self):
+		def trade(customer, currency, transaction_type, amount, time):
+			return frappe._dict(
+				customer=customer,
+				currency=currency,
+				transaction_type=transaction_type,
+				amount=amount,
+				exchange_rate=100,
+				date_and_time=f"2025-04-07 {time}",
+			)
+
+		totals = get_trading_totals(
+			[
+				trade("Sara Tesfaye", "USD", "Buy", 10, "11:00:00"),
+				trade("Abebe Kebede", "USD", "Buy", 100, "10:00:00"),
+				trade("Abebe Kebede", "USD", "Sell", 40, "12:00:00"),
+				trade("Abebe Kebede", "EUR", "Buy", 5, "09:00:00"),
+			]
+		)
+
+		# sorted, so batches lock the customers in the same order
+		self.assertEqual(
+			[(row["customer"], row["currency"]) for row in totals],
+			[("Abebe Kebede", "EUR"), ("Abebe Kebede", "USD"), ("Sara Tesfaye", "USD")],
+		)
+		usd = totals[1]
+		self.assertEqual(usd["trade_count"], 2)
+		self.assertEqual(usd["turnover"], 14_000)
+		self.assertEqual((usd["amount_bought"], usd["amount_sold"]), (100, 40))
+		self.assertEqual(usd["date_and_time"], get_datetime("2025-04-07 12:00:00"))
+
+
+class IntegrationTestCustomerTradingSummary(IntegrationTestCase):
+	"""
+	Integration tests for Customer Trading Summary.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def setUp(self):
+		if not frappe.db.exists("FXCurrency", TEST_CURRENCY):
+			frappe.get_doc(
+				{
+					"doctype": "FXCurrency",
+					"currency_name": "Summary Test Dollar",
+					"currency_code": "STD",
+					"exchange_rate": 130,
+				}
+			).insert()
+
+		self.customer = (
+			frappe.get_doc(
+				{"doctype": "Customer", "first_name": "Summary", "last_name": frappe.generate_hash(length=8)}
+			)
+			.insert()
+			.name
+		)
+
+	def submit_transaction(self, transaction_type: str, amount: float, time: str):
+		return frappe.get_doc(
+			{
+				"doctype": "Transaction",
+				"customer": self.customer,
+				"customer_name": self.customer,
+				"currency": TEST_CURRENCY,
+				"transaction_type": transaction_type,
+				"amount": amount,
+				"exchange_rate": 130,
+				# today is never closed, so the trades keep their time
+				"date_and_time": f"{today()} {time}",
+			}
+		).submit()
+
+	def get_summary(self) -> tuple[dict, dict]:
+		customer = frappe.db.get_value(
+			"Customer",
+			self.customer,
+			["trade_count", "total_turnover_etb", "last_trade_at"],
+			as_dict=True,
+		)
+		currency = frappe.db.get_value(
+			"Customer Trading Summary",
+			{"customer": self.customer, "currency": TEST_CURRENCY},
+			["trade_count", "turnover_etb", "amount_bought", "amount_sold", "last_trade_at"],
+			as_dict=True,
+		)
+		return customer, currency
+
+	def test_submit_adds_to_summary(self):
+		self.submit_transaction("Buy", 100, "10:00:00")
+		self.submit_transaction("Sell", 40, "11:00:00")
+
+		customer, currency = self.get_summary()
+		self.assertEqual(customer.trade_count, 2)
+		self.assertEqual(customer.total_turnover_etb, 140 * 130)
+		self.assertEqual(customer.last_trade_at, get_datetime(f"{today()} 11:00:00"))
+		self.assertEqual(currency.trade_count, 2)
+		self.assertEqual(currency.amount_bought, 100)
+		self.assertEqual(currency.amount_sold, 40)
+
+	def test_cancel_reverses_and_recomputes_last_trade_at(self):
+		self.submit_transaction("Buy", 100, "10:00:00")
+		latest = self.submit_transaction("Sell", 40, "11:00:00")
+
+		latest.cancel()
+
+		customer, currency = self.get_summary()
+		self.assertEqual(customer.trade_count, 1)
+		self.assertEqual(customer.total_turnover_etb, 100 * 130)
+		self.assertEqual(currency.amount_sold, 0)
+		# the cancelled trade was the latest one, so the time moves back to the earlier trade
+		self.assertEqual(customer.last_trade_at, get_datetime(f"{today()} 10:00:00"))
+		self.assertEqual(currency.last_trade_at, get_datetime(f"{today()} 10:00:00"))
+
+	def test_rebuild_matches_incremental_totals(self):
+		self.submit_transaction("Buy", 100, "10:00:00")
+		self.submit_transaction("Buy", 25, "12:00:00").cancel()
+		self.submit_transaction("Sell", 40, "11:00:00")
+		incremental = self.get_summary()
+
+		rebuild_trading_summaries(self.customer)
+
+		self.assertEqual(self.get_summary(), incremental)
@@ -1,9 +1,25 @@
 # Copyright (c) 2025, Natnael Abrham and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
+from forex_management.rates import clear_rate_matrix
+from forex_management.report_cache import expire_report_cache
+from forex_management.valuation import revalue_after_commit
+
 
 class FXCurrency(Document):
-	pass
+	def on_update(self):
+		if self.has_value_changed("exchange_rate"):
+			clear_rate_matrix()
+			# converted report amounts move with the rate
+			expire_report_cache()
+			if frappe.db.exists("Currency Position", self.name):
+				revalue_after_commit(self.name)
+
+	def on_trash(self):
+		clear_rate_matrix()
+
+	def after_rename(self, old, new, merge=False):
+		clear_rate_matrix()
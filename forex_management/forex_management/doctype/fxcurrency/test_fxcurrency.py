@@ -1,9 +1,13 @@
 # Copyright (c) 2025, Natnael Abrham and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import numpy as np
 from frappe.tests import IntegrationTestCase, UnitTestCase
 
+from forex_management.rates import convert, get_etb_rates
+
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -18,7 +22,24 @@ class UnitTestFXCurrency(UnitTestCase):
 	Use this class for testing individual functions and methods.
 	"""
 
-	pass
+	@patch("forex_management.rates.get_rate_matrix")
+	def test_convert_uses_cross_rates(self, get_rate_matrix):
+		etb_rates = np.array([1.0, 136.0, 150.0])
+		index = {"ETB": 0, "US Dollar (USD)": 1, "Euro (EUR)": 2}
+		get_rate_matrix.return_value = (index, etb_rates[:, None] / etb_rates[None, :])
+
+		converted = convert([100, 136, 1], ["Euro (EUR)", "ETB", "Unknown (XXX)"], "US Dollar (USD)")
+
+		np.testing.assert_allclose(converted[:2], [100 * 150 / 136, 1.0])
+		self.assertTrue(np.isnan(converted[2]))
+
+	@patch("forex_management.rates.get_rate_matrix")
+	def test_etb_rates_leave_out_missing_rates(self, get_rate_matrix):
+		etb_rates = np.array([1.0, 136.0, np.nan])
+		index = {"ETB": 0, "US Dollar (USD)": 1, "Euro (EUR)": 2}
+		get_rate_matrix.return_value = (index, etb_rates[:, None] / etb_rates[None, :])
+
+		self.assertEqual(get_etb_rates(), {"ETB": 1.0, "US Dollar (USD)": 136.0, "Euro (EUR)": None})
 
 
 class IntegrationTestFXCurrency(IntegrationTestCase):
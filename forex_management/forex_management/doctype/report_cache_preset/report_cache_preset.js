@@ -0,0 +1,10 @@
+// Copyright (c) 2025, Natnael Abrham and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Report Cache Preset", {
+	setup(frm) {
+		frm.set_query("report", () => ({
+			filters: { module: "Forex Management", report_type: "Script Report" },
+		}));
+	},
+});
@@ -0,0 +1,49 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import get_first_day, get_first_day_of_week, get_last_day, get_last_day_of_week, getdate
+
+
+class ReportCachePreset(Document):
+	def validate(self):
+		if frappe.db.get_value("Report", self.report, "module") != "Forex Management":
+			frappe.throw(_("Only reports of Forex Management can be warmed."))
+
+		try:
+			filters = json.loads(self.filters or "{}")
+		except ValueError:
+			filters = None
+		if not isinstance(filters, dict):
+			frappe.throw(_("Filters must be a JSON object."))
+
+	def get_filter_sets(self) -> list[dict]:
+		"""Return the report filters this preset stands for today, one set per active currency if enabled."""
+		filters = json.loads(self.filters or "{}")
+		filters.update(get_period_filters(self.period))
+		if not self.per_currency:
+			return [filters]
+
+		return [
+			{**filters, "currency": currency}
+			for currency in frappe.get_all("FXCurrency", filters={"is_active": 1}, pluck="name")
+		]
+
+
+def get_period_filters(period: str, date=None) -> dict:
+	"""Return the from/to date filters of `period` around `date`, the same values the date pickers send."""
+	date = getdate(date)
+	if period == "Today":
+		start, end = date, date
+	elif period == "This Week":
+		start, end = get_first_day_of_week(date), get_last_day_of_week(date)
+	elif period == "This Month":
+		start, end = get_first_day(date), get_last_day(date)
+	else:
+		return {}
+
+	return {"from_date": f"{start} 00:00:00", "to_date": f"{end} 23:59:59"}
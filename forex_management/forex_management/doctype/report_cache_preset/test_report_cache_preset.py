@@ -0,0 +1,57 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from forex_management.forex_management.doctype.report_cache_preset.report_cache_preset import (
+	get_period_filters,
+)
+from forex_management.report_cache import bump_data_version, get_data_version
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestReportCachePreset(UnitTestCase):
+	"""
+	Unit tests for Report Cache Preset.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_period_filters_cover_whole_days(self):
+		self.assertEqual(get_period_filters("All Time", "2025-04-16"), {})
+		self.assertEqual(
+			get_period_filters("Today", "2025-04-16"),
+			{"from_date": "2025-04-16 00:00:00", "to_date": "2025-04-16 23:59:59"},
+		)
+		self.assertEqual(
+			get_period_filters("This Month", "2025-04-16"),
+			{"from_date": "2025-04-01 00:00:00", "to_date": "2025-04-30 23:59:59"},
+		)
+
+
+class IntegrationTestReportCachePreset(IntegrationTestCase):
+	"""
+	Integration tests for Report Cache Preset.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def test_trade_only_expires_results_of_its_currency(self):
+		usd, eur, unfiltered = {"currency": "Cache Test USD"}, {"currency": "Cache Test EUR"}, {}
+		before = {
+			name: get_data_version(filters)
+			for name, filters in (("usd", usd), ("eur", eur), ("all", unfiltered))
+		}
+
+		bump_data_version(["Cache Test USD"])
+		self.assertNotEqual(get_data_version(usd), before["usd"])
+		self.assertEqual(get_data_version(eur), before["eur"])
+		self.assertNotEqual(get_data_version(unfiltered), before["all"])
+
+		# a rate change expires every result
+		bump_data_version()
+		self.assertNotEqual(get_data_version(eur), before["eur"])
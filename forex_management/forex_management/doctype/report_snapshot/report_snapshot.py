@@ -0,0 +1,14 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+
+
+class ReportSnapshot(Document):
+	@staticmethod
+	def clear_old_logs(days=400):
+		table = frappe.qb.DocType("Report Snapshot")
+		frappe.db.delete(table, filters=(table.creation < (Now() - Interval(days=days))))
@@ -0,0 +1,93 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from forex_management.report_snapshots import decode_result, diff_results, encode_result
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestReportSnapshot(UnitTestCase):
+	"""
+	Unit tests for Report Snapshot.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_diff_joins_rows_on_customer(self):
+		columns = [
+			{"fieldname": "customer", "fieldtype": "Data"},
+			{"fieldname": "amount_bought", "fieldtype": "Value"},
+		]
+		last_week = [
+			{"customer": "Abebe Kebede", "amount_bought": "1,000.00"},
+			{"customer": "Sara Tesfaye", "amount_bought": "500.00"},
+		]
+		this_week = [
+			{"customer": "Abebe Kebede", "amount_bought": "1,500.00"},
+			{"customer": "Hana Girma", "amount_bought": "20.00"},
+		]
+
+		diff = diff_results(
+			decode_result(encode_result(columns, last_week)), decode_result(encode_result(columns, this_week))
+		)
+		rows = {row["customer"]: row for row in diff["rows"]}
+
+		self.assertEqual(diff["key_fields"], ["customer"])
+		self.assertEqual(rows["Abebe Kebede"]["amount_bought_change"], 500)
+		self.assertEqual(rows["Abebe Kebede"]["status"], "Changed")
+		self.assertEqual(rows["Sara Tesfaye"]["status"], "Removed")
+		self.assertEqual(rows["Hana Girma"]["amount_bought_before"], 0)
+		self.assertEqual(rows["Hana Girma"]["status"], "Added")
+
+	def test_diff_keeps_number_columns_of_either_run(self):
+		customer = {"fieldname": "customer", "fieldtype": "Link"}
+		bought = {"fieldname": "amount_bought", "fieldtype": "Float"}
+		sold = {"fieldname": "amount_sold", "fieldtype": "Float"}
+
+		diff = diff_results(
+			decode_result(encode_result([customer, sold], [{"customer": "Abebe Kebede", "amount_sold": 40}])),
+			decode_result(
+				encode_result([customer, bought], [{"customer": "Abebe Kebede", "amount_bought": 70}])
+			),
+		)
+		(row,) = diff["rows"]
+
+		self.assertEqual(diff["number_fields"], ["amount_bought", "amount_sold"])
+		self.assertEqual(row["amount_bought_before"], 0)
+		self.assertEqual(row["amount_sold_after"], 0)
+		self.assertEqual(row["amount_sold_change"], -40)
+
+	def test_diff_uses_the_declared_key_and_skips_rates(self):
+		columns = [
+			{"fieldname": "customer", "fieldtype": "Link"},
+			{"fieldname": "amount_etb", "fieldtype": "Float"},
+			{"fieldname": "currency", "fieldtype": "Data"},
+			{"fieldname": "exchange_rate", "fieldtype": "Float"},
+		]
+		# one row per customer, the currency is the one of any of its trades
+		last_week = [{"customer": "Abebe Kebede", "amount_etb": 100, "currency": "USD", "exchange_rate": 55}]
+		this_week = [{"customer": "Abebe Kebede", "amount_etb": 300, "currency": "EUR", "exchange_rate": 60}]
+		before = decode_result(encode_result(columns, last_week, ["customer"]))
+		after = decode_result(encode_result(columns, this_week, ["customer"]))
+
+		(row,) = diff_results(before, after, ["customer"], ["amount_etb"])["rows"]
+		self.assertEqual(row["status"], "Changed")
+		self.assertEqual(row["amount_etb_change"], 200)
+		self.assertNotIn("exchange_rate_change", row)
+
+		self.assertEqual(diff_results(before, after)["number_fields"], ["amount_etb"])
+
+
+class IntegrationTestReportSnapshot(IntegrationTestCase):
+	"""
+	Integration tests for Report Snapshot.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	pass
@@ -0,0 +1,89 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import get_datetime, getdate
+
+from forex_management.period_close import split_closed_days
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestTradingDayClose(UnitTestCase):
+	"""
+	Unit tests for Trading Day Close.
+	Use this class for testing individual functions and methods.
+	"""
+
+	@patch(
+		"forex_management.period_close.get_closed_range",
+		return_value=(getdate("2025-03-01"), getdate("2025-03-31")),
+	)
+	def test_split_reads_whole_closed_days_from_totals(self, _get_closed_range):
+		closed_filters, open_filters = split_closed_days(
+			{"customer": "CUST-0001", "date_and_time": ["between", ["2025-03-10 12:00:00", "2025-04-02"]]}
+		)
+
+		self.assertEqual(
+			closed_filters,
+			[
+				["customer", "=", "CUST-0001"],
+				["date_and_time", ">=", get_datetime("2025-03-11")],
+				["date_and_time", "<", get_datetime("2025-04-01")],
+			],
+		)
+		# the partial first day and the open days after the close are scanned, the
+		# last one up to its end
+		self.assertEqual(len(open_filters), 2)
+		self.assertIn(["date_and_time", ">=", "2025-03-10 12:00:00"], open_filters[0])
+		self.assertIn(["date_and_time", "<", get_datetime("2025-04-03")], open_filters[1])
+
+	@patch(
+		"forex_management.period_close.get_closed_range",
+		return_value=(getdate("2025-03-01"), getdate("2025-04-01")),
+	)
+	def test_split_scans_the_whole_open_last_day(self, _get_closed_range):
+		closed_filters, open_filters = split_closed_days(
+			{"date_and_time": ["between", ["2025-03-30", "2025-04-02"]]}
+		)
+
+		self.assertIn(["date_and_time", "<", get_datetime("2025-04-02")], closed_filters)
+		self.assertEqual(
+			open_filters,
+			[
+				[
+					["date_and_time", ">=", get_datetime("2025-04-02")],
+					["date_and_time", "<", get_datetime("2025-04-03")],
+				]
+			],
+		)
+
+		# a closed last day needs no scan at all
+		closed_filters, open_filters = split_closed_days(
+			{"date_and_time": ["between", ["2025-03-30", "2025-04-01"]]}
+		)
+		self.assertIn(["date_and_time", "<", get_datetime("2025-04-02")], closed_filters)
+		self.assertEqual(open_filters, [])
+
+	@patch("forex_management.period_close.get_closed_range", return_value=None)
+	def test_split_without_closed_days_scans_everything(self, _get_closed_range):
+		closed_filters, open_filters = split_closed_days({"date_and_time": [">=", "2025-03-10"]})
+
+		self.assertIsNone(closed_filters)
+		self.assertEqual(open_filters, [[["date_and_time", ">=", "2025-03-10"]]])
+
+
+class IntegrationTestTradingDayClose(IntegrationTestCase):
+	"""
+	Integration tests for Trading Day Close.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	pass
@@ -1,9 +1,11 @@
 # Copyright (c) 2025, Natnael Abrham and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests import IntegrationTestCase, UnitTestCase
 
+from forex_management.realtime import get_transaction_delta
+
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -18,7 +20,23 @@ class UnitTestTransaction(UnitTestCase):
 	Use this class for testing individual functions and methods.
 	"""
 
-	pass
+	def test_cancel_delta_reverses_submit_delta(self):
+		doc = frappe._dict(
+			customer="Abebe Kebede",
+			customer_name="Abebe Kebede",
+			currency="United States Dollar (USD)",
+			transaction_type="Buy",
+			amount=100,
+			exchange_rate=136.5,
+			date_and_time="2025-04-05 10:00:00",
+		)
+
+		submitted = get_transaction_delta(doc)
+		cancelled = get_transaction_delta(doc, sign=-1)
+
+		self.assertEqual(submitted["amount_etb"], 13650)
+		self.assertEqual(cancelled["amount"], -submitted["amount"])
+		self.assertEqual(cancelled["amount_etb"], -submitted["amount_etb"])
 
 
 class IntegrationTestTransaction(IntegrationTestCase):
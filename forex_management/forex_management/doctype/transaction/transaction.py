@@ -1,10 +1,122 @@
 # Copyright (c) 2025, Natnael Abrham and contributors
 # For license information, please see license.txt
 
-# import frappe
+import math
+
+import frappe
+from frappe import _
 from frappe.model.document import Document
+from frappe.utils import flt
+
+from forex_management.forex_management.doctype.customer.customer import (
+	update_trading_summaries,
+	update_trading_summary,
+)
+from forex_management.period_close import book_late_transaction, check_cancellation
+from forex_management.rates import HOME_CURRENCY, get_cross_rate, get_currency_code
+from forex_management.realtime import queue_transaction_delta
+from forex_management.report_cache import expire_report_cache
+from forex_management.valuation import reverse_positions, update_positions
+from forex_management.velocity import check_transaction, flag_transaction, record_transaction
 
 
 class Transaction(Document):
 	def autoname(self):
-		self.name = f"{self.currency.split('(')[1].replace(')', '')}/ETB - Amount: {self.amount}"
+		# the suffix keeps two trades of the same pair and amount from colliding on the
+		# primary key, which made concurrent submits fail with a duplicate entry
+		self.name = (
+			f"{get_currency_code(self.currency)}/{get_currency_code(self.quote_currency)} - Amount: {self.amount}"
+			f" - {frappe.generate_hash(length=6).upper()}"
+		)
+
+	def validate(self):
+		self.validate_quote_currency()
+		self.set_amount_etb()
+		check_transaction(self, batch=self.flags.batch)
+
+	def validate_quote_currency(self):
+		if get_currency_code(self.quote_currency) == HOME_CURRENCY:
+			self.quote_currency = None
+		elif self.quote_currency == self.currency:
+			frappe.throw(_("Quote Currency must differ from Currency."))
+
+	def set_amount_etb(self):
+		# the ETB rate of the quote currency is taken at the time of the trade, so the
+		# value stays fixed when rates move later
+		amount_in_quote = flt(self.amount) * flt(self.exchange_rate)
+		if not self.quote_currency:
+			self.amount_etb = amount_in_quote
+			return
+
+		quote_rate = get_cross_rate(self.quote_currency, HOME_CURRENCY)
+		if math.isnan(quote_rate):
+			frappe.throw(
+				_("Set the ETB exchange rate of {0} first.").format(frappe.bold(self.quote_currency))
+			)
+		self.amount_etb = amount_in_quote * quote_rate
+
+	def before_submit(self):
+		book_late_transaction(self)
+
+	def on_submit(self):
+		after_submit([self])
+
+	def before_cancel(self):
+		check_cancellation(self)
+
+	def on_cancel(self):
+		update_trading_summary(self, sign=-1)
+		reverse_positions(self)
+		record_transaction(self, sign=-1)
+		queue_transaction_delta(self, sign=-1)
+		expire_report_cache([self.currency])
+
+
+def after_submit(transactions: list):
+	"""Book submitted `transactions`, the `on_submit` of one trade or of a batch.
+
+	Row locks are taken last and always in the same order: the Customers, each with
+	its Customer Trading Summaries, then the Currency Positions sorted by currency. The
+	hot position rows are held only until the commit right after, and concurrent
+	submits queue up on them instead of deadlocking.
+	"""
+	for transaction in transactions:
+		flag_transaction(transaction, batch=transactions)
+	update_trading_summaries(transactions)
+	update_positions(transactions)
+	for transaction in transactions:
+		record_transaction(transaction)
+		queue_transaction_delta(transaction)
+	expire_report_cache({transaction.currency for transaction in transactions})
+
+
+def validate_for_batch(doc: Transaction, batch: list[Transaction]):
+	"""Name and validate a new `doc` with docstatus 1 the way `Document.insert` does, without writing it.
+
+	`batch` holds the trades of the same batch validated before it, which the velocity
+	rules count as well. The batch is written by `insert_batch`.
+	"""
+	doc.set("__islocal", True)
+	doc.flags.batch = batch
+	doc._set_defaults()
+	doc.set_user_and_timestamp()
+	doc.set_docstatus()
+	doc.check_if_latest()
+	doc._validate_links()
+	doc.check_permission("create")
+	doc.set_new_name()
+	doc.run_before_save_methods()
+	doc._validate()
+
+
+def insert_batch(transactions: list[Transaction]):
+	"""Write validated `transactions` with one multi-row INSERT and book them together."""
+	rows = [transaction.get_valid_dict(convert_dates_to_str=True) for transaction in transactions]
+	fields = list(rows[0])
+	frappe.db.bulk_insert(
+		"Transaction", fields=fields, values=[[row[field] for field in fields] for row in rows]
+	)
+	for transaction in transactions:
+		transaction.set("__islocal", False)
+		transaction.flags.batch = None
+	after_submit(transactions)
@@ -0,0 +1,168 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import now_datetime
+
+from forex_management.velocity import clear_rules_cache, evaluate_rules, get_counter_key, increment_counters
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+TEST_CURRENCY = "Velocity Test Dollar (VTD)"
+
+
+class UnitTestTransactionAlertRule(UnitTestCase):
+	"""
+	Unit tests for Transaction Alert Rule.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_rule_counts_trades_inside_window(self):
+		customer = f"_Test Velocity {frappe.generate_hash(length=6)}"
+		rule = frappe._dict(
+			name="_Test 24h Buy Volume",
+			transaction_type="Buy",
+			currency=None,
+			window_hours=24,
+			threshold_etb=25_000,
+			max_trades=0,
+			action="Flag",
+		)
+		trade = frappe._dict(
+			customer=customer,
+			currency="United States Dollar (USD)",
+			transaction_type="Buy",
+			amount=100,
+			exchange_rate=100,
+			date_and_time=now_datetime(),
+		)
+
+		try:
+			self.assertEqual(evaluate_rules(trade, rules=[rule]), [])
+
+			increment_counters(trade)
+			increment_counters(frappe._dict(trade, transaction_type="Sell"))
+			self.assertEqual(evaluate_rules(trade, rules=[rule]), [])
+
+			increment_counters(trade)
+			((_rule, volume, count),) = evaluate_rules(trade, rules=[rule])
+			self.assertEqual((volume, count), (30_000, 3))
+		finally:
+			frappe.cache.delete(get_counter_key(customer))
+
+	def test_counters_are_seeded_when_a_trade_lands_after_a_flush(self):
+		customer = f"_Test Velocity {frappe.generate_hash(length=6)}"
+		rule = frappe._dict(
+			name="_Test 24h Volume",
+			transaction_type=None,
+			currency=None,
+			window_hours=24,
+			threshold_etb=25_000,
+			max_trades=0,
+			action="Flag",
+		)
+		trade = frappe._dict(
+			customer=customer,
+			currency="United States Dollar (USD)",
+			transaction_type="Buy",
+			amount=100,
+			exchange_rate=100,
+			amount_etb=10_000,
+			date_and_time=now_datetime(),
+		)
+
+		try:
+			# the hash was flushed, then a trade no rule looked at was recorded on commit
+			frappe.cache.delete(get_counter_key(customer))
+			increment_counters(trade)
+
+			# the database holds that trade and one from before the flush
+			with patch("frappe.get_all", return_value=[trade, frappe._dict(trade)]):
+				((_rule, volume, count),) = evaluate_rules(trade, rules=[rule])
+			self.assertEqual((volume, count), (30_000, 3))
+		finally:
+			frappe.cache.delete(get_counter_key(customer))
+
+
+class IntegrationTestTransactionAlertRule(IntegrationTestCase):
+	"""
+	Integration tests for Transaction Alert Rule.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def setUp(self):
+		if not frappe.db.exists("FXCurrency", TEST_CURRENCY):
+			frappe.get_doc(
+				{
+					"doctype": "FXCurrency",
+					"currency_name": "Velocity Test Dollar",
+					"currency_code": "VTD",
+					"exchange_rate": 100,
+				}
+			).insert()
+
+		self.customer = (
+			frappe.get_doc(
+				{"doctype": "Customer", "first_name": "Velocity", "last_name": frappe.generate_hash(length=8)}
+			)
+			.insert()
+			.name
+		)
+		self.rule = (
+			frappe.get_doc(
+				{
+					"doctype": "Transaction Alert Rule",
+					"rule_name": f"_Test One Trade {self.customer}",
+					"enabled": 1,
+					"action": "Flag",
+					"currency": TEST_CURRENCY,
+					"window_hours": 24,
+					"max_trades": 1,
+				}
+			)
+			.insert()
+			.name
+		)
+		# the rule and the counters outlive the rolled back test transaction
+		self.addCleanup(clear_rules_cache)
+		self.addCleanup(frappe.cache.delete, get_counter_key(self.customer))
+
+	def submit_transaction(self):
+		return frappe.get_doc(
+			{
+				"doctype": "Transaction",
+				"customer": self.customer,
+				"customer_name": self.customer,
+				"currency": TEST_CURRENCY,
+				"transaction_type": "Buy",
+				"amount": 100,
+				"exchange_rate": 100,
+				"date_and_time": now_datetime(),
+			}
+		).submit()
+
+	def get_alert_counts(self) -> list[int]:
+		return frappe.get_all(
+			"Transaction Alert",
+			filters={"rule": self.rule, "customer": self.customer},
+			pluck="trade_count",
+		)
+
+	def test_first_trade_of_a_customer_is_counted_once(self):
+		# no trades in the window, so the counters are seeded while the trade is submitted
+		self.submit_transaction()
+		self.assertEqual(self.get_alert_counts(), [])
+
+		# seeding again after a flush counts the first trade from the database, and the
+		# second trade once
+		frappe.cache.delete(get_counter_key(self.customer))
+		self.submit_transaction()
+		self.assertEqual(self.get_alert_counts(), [2])
@@ -0,0 +1,23 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from forex_management.velocity import MAX_WINDOW_HOURS, clear_rules_cache
+
+
+class TransactionAlertRule(Document):
+	def validate(self):
+		if not 0 < self.window_hours <= MAX_WINDOW_HOURS:
+			frappe.throw(_("Window must be between 1 and {0} hours.").format(MAX_WINDOW_HOURS))
+
+		if not self.threshold_etb and not self.max_trades:
+			frappe.throw(_("Set a volume threshold, a maximum number of trades, or both."))
+
+	def on_update(self):
+		clear_rules_cache()
+
+	def on_trash(self):
+		clear_rules_cache()
@@ -0,0 +1,44 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from forex_management.archive import merge_groups
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestTransactionArchive(UnitTestCase):
+	"""
+	Unit tests for Transaction Archive.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_merge_groups_combines_live_and_archived_totals(self):
+		live = [
+			frappe._dict(customer="A", total_amount=100, last_trade="2025-04-01"),
+			frappe._dict(customer="B", total_amount=50, last_trade="2025-04-02"),
+		]
+		archived = [frappe._dict(customer="A", total_amount=25, last_trade="2023-01-01")]
+
+		merged = merge_groups(live + archived, {"total_amount": "SUM", "last_trade": "MAX"}, ["customer"])
+
+		self.assertEqual(
+			{row.customer: (row.total_amount, row.last_trade) for row in merged},
+			{"A": (125, "2025-04-01"), "B": (50, "2025-04-02")},
+		)
+
+
+class IntegrationTestTransactionArchive(IntegrationTestCase):
+	"""
+	Integration tests for Transaction Archive.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	pass
@@ -0,0 +1,144 @@
+# Copyright (c) 2025, Natnael Abrham and Contributors
+# See license.txt
+
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from forex_management.api import submit_transactions
+from forex_management.submit_benchmark import remove_trades
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+TEST_CURRENCY = "Batch Test Dollar (BTD)"
+# threads submitting at once for the same customer, and trades per thread
+CONCURRENT_SUBMITS = 4
+TRADES_PER_SUBMIT = 5
+
+
+class UnitTestTransactionRequest(UnitTestCase):
+	"""
+	Unit tests for Transaction Request.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class IntegrationTestTransactionRequest(IntegrationTestCase):
+	"""
+	Integration tests for Transaction Request.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def setUp(self):
+		if not frappe.db.exists("FXCurrency", TEST_CURRENCY):
+			frappe.get_doc(
+				{
+					"doctype": "FXCurrency",
+					"currency_name": "Batch Test Dollar",
+					"currency_code": "BTD",
+					"exchange_rate": 100,
+				}
+			).insert()
+
+		self.run = frappe.generate_hash(length=6).lower()
+		self.customer = (
+			frappe.get_doc({"doctype": "Customer", "first_name": "Batch", "last_name": self.run})
+			.insert()
+			.name
+		)
+		# the batch commits, so its trades are removed again explicitly
+		frappe.db.commit()
+		self.addCleanup(remove_trades, [self.customer], [TEST_CURRENCY], f"_test-{self.run}-")
+
+	def get_items(self) -> list[dict]:
+		return [
+			{
+				"idempotency_key": f"_test-{self.run}-{i}",
+				"customer": self.customer,
+				"currency": TEST_CURRENCY,
+				"transaction_type": transaction_type,
+				"amount": amount,
+				"exchange_rate": 100,
+			}
+			for i, (transaction_type, amount) in enumerate([("Buy", 100), ("Buy", 50), ("Sell", 30)])
+		]
+
+	def test_batch_is_booked_once(self):
+		results = submit_transactions(self.get_items())
+
+		self.assertEqual([result["status"] for result in results], ["Submitted"] * 3)
+		self.assertEqual(frappe.db.count("Transaction", {"customer": self.customer, "docstatus": 1}), 3)
+		summary = frappe.db.get_value(
+			"Customer Trading Summary",
+			{"customer": self.customer, "currency": TEST_CURRENCY},
+			["trade_count", "amount_bought", "amount_sold"],
+			as_dict=True,
+		)
+		self.assertEqual((summary.trade_count, summary.amount_bought, summary.amount_sold), (3, 150, 30))
+		self.assertEqual(frappe.db.get_value("Customer", self.customer, "trade_count"), 3)
+
+		# a resend after a timeout books nothing and returns the same trades
+		resent = submit_transactions(self.get_items())
+		self.assertEqual([result["status"] for result in resent], ["Duplicate"] * 3)
+		self.assertEqual([result["name"] for result in resent], [result["name"] for result in results])
+
+	def test_failed_item_does_not_affect_the_others(self):
+		items = self.get_items()
+		items[1]["customer"] = f"_Test Missing {self.run}"
+
+		results = submit_transactions(items)
+
+		self.assertEqual([result["status"] for result in results], ["Submitted", "Failed", "Submitted"])
+		self.assertEqual(frappe.db.count("Transaction", {"customer": self.customer, "docstatus": 1}), 2)
+
+	def test_concurrent_submits_for_one_customer_all_succeed(self):
+		site, sites_path = frappe.local.site, frappe.local.sites_path
+
+		def submit_from_own_connection(thread: int) -> list[dict]:
+			# frappe.local is per thread, so every thread has its own DB connection
+			frappe.init(site=site, sites_path=sites_path)
+			frappe.connect()
+			frappe.set_user("Administrator")
+			try:
+				items = self.get_items()
+				return submit_transactions(
+					[
+						{**items[i % len(items)], "idempotency_key": f"_test-{self.run}-{thread}-{i}"}
+						for i in range(TRADES_PER_SUBMIT)
+					]
+				)
+			finally:
+				frappe.destroy()
+
+		# all threads lock the same Customer, trading summary and currency position rows
+		with ThreadPoolExecutor(max_workers=CONCURRENT_SUBMITS) as pool:
+			results = [
+				result
+				for thread_results in pool.map(submit_from_own_connection, range(CONCURRENT_SUBMITS))
+				for result in thread_results
+			]
+
+		expected = CONCURRENT_SUBMITS * TRADES_PER_SUBMIT
+		self.assertEqual([result["status"] for result in results], ["Submitted"] * expected)
+		# start a new DB transaction to see what the threads committed
+		frappe.db.rollback()
+		self.assertEqual(
+			frappe.db.count("Transaction", {"customer": self.customer, "docstatus": 1}), expected
+		)
+		self.assertEqual(frappe.db.get_value("Customer", self.customer, "trade_count"), expected)
+		self.assertEqual(
+			frappe.db.get_value(
+				"Customer Trading Summary",
+				{"customer": self.customer, "currency": TEST_CURRENCY},
+				"trade_count",
+			),
+			expected,
+		)
@@ -0,0 +1,8 @@
+// Copyright (c) 2025, Natnael Abrham and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Transaction Request", {
+// 	refresh(frm) {
+
+// 	},
+// });
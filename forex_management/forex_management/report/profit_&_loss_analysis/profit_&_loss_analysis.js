@@ -20,4 +20,26 @@ frappe.query_reports["Profit & Loss Analysis"] = {
 			fieldtype: "Datetime",
 		},
 	],
+
+	onload(report) {
+		const { add_to_row, parse_amount, format_amount } = forex_management.live_reports;
+		forex_management.live_reports.subscribe("Profit & Loss Analysis", {
+			sort_by: (row) => parse_amount(row.amount_bought) + parse_amount(row.amount_sold),
+			apply(data, delta) {
+				const fieldname = delta.transaction_type === "Buy" ? "amount_bought" : "amount_sold";
+				const row = add_to_row(data, "customer", delta.customer_name, { [fieldname]: delta.amount_etb }, true);
+				row.amount_bought = row.amount_bought || "0.00";
+				row.amount_sold = row.amount_sold || "0.00";
+				row.profit_loss = format_amount(parse_amount(row.amount_sold) - parse_amount(row.amount_bought));
+			},
+			get_chart: (data) => ({
+				labels: data.map((row) => row.customer),
+				datasets: [
+					{ name: __("Bought"), values: data.map((row) => parse_amount(row.amount_bought)) },
+					{ name: __("Sold"), values: data.map((row) => parse_amount(row.amount_sold)) },
+					{ name: __("Profit/Loss"), values: data.map((row) => parse_amount(row.profit_loss)) },
+				],
+			}),
+		});
+	},
 };
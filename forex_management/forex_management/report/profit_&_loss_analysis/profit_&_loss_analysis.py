@@ -3,9 +3,16 @@
 
 # import frappe
 from frappe import _
-import frappe
 
+from forex_management.archive import get_all_transactions
+from forex_management.report_cache import cached_report
 
+# columns Report Snapshot joins two runs on and compares
+SNAPSHOT_KEY_FIELDS = ["customer"]
+SNAPSHOT_NUMBER_FIELDS = ["amount_bought", "amount_sold", "profit_loss"]
+
+
+@cached_report("Profit & Loss Analysis")
 def execute(filters: dict | None = None):
     """Return columns and data for the report.
 
@@ -62,15 +69,14 @@ def get_data(filters: dict | None) -> list[list]:
     elif filters.get("to_date"):
         filter_opts["date_and_time"] = ["<", filters["to_date"]]
 
-    transactions = frappe.db.get_all(
-        "Transaction",
+    transactions = get_all_transactions(
         filters=filter_opts,
         fields=[
             "customer_name",
             "exchange_rate",
-            "SUM(IF(transaction_type = 'Buy', amount, 0)) as amount_bought",
-            "SUM(IF(transaction_type = 'Sell', amount, 0)) as amount_sold",
-            "SUM(amount) as total_amount",
+            "SUM(IF(transaction_type = 'Buy', amount_etb, 0)) as amount_bought",
+            "SUM(IF(transaction_type = 'Sell', amount_etb, 0)) as amount_sold",
+            "SUM(amount_etb) as total_amount",
         ],
         order_by="total_amount desc",
         group_by="customer",
@@ -125,12 +131,11 @@ def get_summary_report(filters) -> dict:
     elif filters.get("to_date"):
         filter_opts["date_and_time"] = ["<", filters["to_date"]]
 
-    transactions = frappe.db.get_all(
-        "Transaction",
+    transactions = get_all_transactions(
         filters=filter_opts,
         fields=[
-            "SUM(IF(transaction_type = 'Buy', amount, 0)) as amount_bought",
-            "SUM(IF(transaction_type = 'Sell', amount, 0)) as amount_sold",
+            "SUM(IF(transaction_type = 'Buy', amount_etb, 0)) as amount_bought",
+            "SUM(IF(transaction_type = 'Sell', amount_etb, 0)) as amount_sold",
         ],
     )
     total_amount_bought = transactions[0].amount_bought if transactions else 0
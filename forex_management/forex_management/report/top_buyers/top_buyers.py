@@ -2,11 +2,19 @@
 # For license information, please see license.txt
 
 # import frappe
-from turtle import width
 from frappe import _
-import frappe
 
+from forex_management.archive import get_all_transactions
+from forex_management.rates import HOME_CURRENCY, convert_rows, get_currency_code
+from forex_management.report_cache import cached_report
 
+# columns Report Snapshot joins two runs on and compares,
+# one row per customer, the currency and rate shown are those of one of its trades
+SNAPSHOT_KEY_FIELDS = ["customer"]
+SNAPSHOT_NUMBER_FIELDS = ["amount_fx", "amount_etb", "amount_report"]
+
+
+@cached_report("Top Buyers")
 def execute(filters: dict | None = None):
     """Return columns and data for the report.
 
@@ -14,20 +22,19 @@ def execute(filters: dict | None = None):
     dictionary and should return columns and data. It is called by the framework
     every time the report is refreshed or a filter is updated.
     """
-    columns = get_columns()
+    columns = get_columns(filters=filters)
     data = get_data(filters=filters)
     chart = get_chart(filters=filters)
 
     return columns, data, None, chart
 
 
-def get_columns() -> list[dict]:
+def get_columns(filters: dict | None = None) -> list[dict]:
     """Return columns for the report.
 
     One field definition per column, just like a DocType field definition.
     """
-
-    return [
+    columns = [
         {
             "fieldname": "customer",
             "label": _("Customer"),
@@ -65,6 +72,19 @@ def get_columns() -> list[dict]:
         },
     ]
 
+    if filters and filters.get("report_currency"):
+        columns.append(
+            {
+                "fieldname": "amount_report",
+                "label": _("Amount ({0})").format(get_currency_code(filters["report_currency"])),
+                "fieldtype": "Float",
+                "width": 120,
+                "precision": 2,
+            }
+        )
+
+    return columns
+
 
 def get_data(filters: dict | None) -> list[list]:
     """Return data for the report.
@@ -87,28 +107,34 @@ def get_data(filters: dict | None) -> list[list]:
     elif filters.get("to_date"):
         filter_opts["date_and_time"] = ["<", filters["to_date"]]
 
-    transactions = frappe.db.get_all(
-        "Transaction",
+    transactions = get_all_transactions(
         filters=filter_opts,
-        fields=["customer_name", "currency", "exchange_rate", "SUM(amount) as total_amount"],
+        fields=[
+            "customer_name",
+            "currency",
+            "exchange_rate",
+            "SUM(amount) as total_amount",
+            "SUM(amount_etb) as total_etb",
+        ],
         order_by="total_amount desc",
         group_by="customer",
     )
 
     data = []
     for transaction in transactions:
-        amount_etb = transaction.total_amount * transaction.exchange_rate
-
         data.append(
             {
                 "customer": transaction.customer_name,
                 "amount_fx": transaction.total_amount,
-                "amount_etb": amount_etb,
+                "amount_etb": transaction.total_etb,
                 "currency": transaction.currency,
                 "exchange_rate": transaction.exchange_rate,
             }
         )
 
+    if filters.get("report_currency"):
+        convert_rows(data, "amount_etb", HOME_CURRENCY, filters["report_currency"], "amount_report")
+
     return data
 
 
@@ -26,5 +26,43 @@ frappe.query_reports["Top Currencies"] = {
 			label: __("To Date"),
 			fieldtype: "Datetime",
 		},
+		{
+			fieldname: "report_currency",
+			label: __("Report Currency"),
+			fieldtype: "Link",
+			options: "FXCurrency",
+		},
 	],
+
+	onload(report) {
+		const { add_to_row, convert, parse_amount } = forex_management.live_reports;
+		forex_management.live_reports.subscribe("Top Currencies", {
+			sort_by: (row) => parse_amount(row.amount_bought) + parse_amount(row.amount_sold),
+			apply(data, delta, filters) {
+				const is_buy = delta.transaction_type === "Buy";
+				const increments = { [is_buy ? "amount_bought" : "amount_sold"]: delta.amount };
+				if (filters.report_currency) {
+					increments[is_buy ? "value_bought" : "value_sold"] = convert(
+						delta.amount,
+						delta.currency,
+						filters.report_currency
+					);
+				}
+				const row = add_to_row(data, "currency", delta.currency, increments, true);
+				const fieldnames = filters.report_currency
+					? ["amount_bought", "amount_sold", "value_bought", "value_sold"]
+					: ["amount_bought", "amount_sold"];
+				for (const fieldname of fieldnames) {
+					row[fieldname] = row[fieldname] || "0.00";
+				}
+			},
+			get_chart: (data) => ({
+				labels: data.map((row) => row.currency),
+				datasets: [
+					{ name: __("Bought"), values: data.map((row) => parse_amount(row.amount_bought)) },
+					{ name: __("Sold"), values: data.map((row) => parse_amount(row.amount_sold)) },
+				],
+			}),
+		});
+	},
 };
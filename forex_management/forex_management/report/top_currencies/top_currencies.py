@@ -3,9 +3,17 @@
 
 # import frappe
 from frappe import _
-import frappe
 
+from forex_management.archive import get_all_transactions
+from forex_management.rates import convert_rows, get_currency_code
+from forex_management.report_cache import cached_report
 
+# columns Report Snapshot joins two runs on and compares
+SNAPSHOT_KEY_FIELDS = ["currency"]
+SNAPSHOT_NUMBER_FIELDS = ["amount_bought", "amount_sold", "value_bought", "value_sold"]
+
+
+@cached_report("Top Currencies")
 def execute(filters: dict | None = None):
     """Return columns and data for the report.
 
@@ -13,7 +21,7 @@ def execute(filters: dict | None = None):
     dictionary and should return columns and data. It is called by the framework
     every time the report is refreshed or a filter is updated.
     """
-    columns = get_columns()
+    columns = get_columns(filters=filters)
     data = get_data(filters=filters)
     chart = get_chart(filters=filters)
     summary_report = get_summary_report(filters=filters)
@@ -21,12 +29,12 @@ def execute(filters: dict | None = None):
     return columns, data, None, chart, summary_report
 
 
-def get_columns() -> list[dict]:
+def get_columns(filters: dict | None = None) -> list[dict]:
     """Return columns for the report.
 
     One field definition per column, just like a DocType field definition.
     """
-    return [
+    columns = [
         {
             "fieldname": "currency",
             "label": _("Currency"),
@@ -48,6 +56,23 @@ def get_columns() -> list[dict]:
         },
     ]
 
+    if filters and filters.get("report_currency"):
+        report_currency_code = get_currency_code(filters["report_currency"])
+        columns += [
+            {
+                "fieldname": "value_bought",
+                "label": _("Bought ({0})").format(report_currency_code),
+                "fieldtype": "Value",
+            },
+            {
+                "fieldname": "value_sold",
+                "label": _("Sold ({0})").format(report_currency_code),
+                "fieldtype": "Value",
+            },
+        ]
+
+    return columns
+
 
 def get_data(filters: dict | None) -> list[list]:
     """Return data for the report.
@@ -70,8 +95,7 @@ def get_data(filters: dict | None) -> list[list]:
     elif filters.get("to_date"):
         filter_opts["date_and_time"] = ["<", filters["to_date"]]
 
-    transactions = frappe.db.get_all(
-        "Transaction",
+    transactions = get_all_transactions(
         filters=filter_opts,
         fields=[
             "currency",
@@ -83,16 +107,23 @@ def get_data(filters: dict | None) -> list[list]:
         group_by="currency",
     )
 
+    if filters.get("report_currency"):
+        convert_rows(transactions, "amount_bought", "currency", filters["report_currency"], "value_bought")
+        convert_rows(transactions, "amount_sold", "currency", filters["report_currency"], "value_sold")
+
     data = []
 
     for transaction in transactions:
-        data.append(
-            {
-                "currency": f"{transaction.currency}",
-                "amount_bought": f"{transaction.amount_bought:,.2f}",
-                "amount_sold": f"{transaction.amount_sold:,.2f}",
-            },
-        )
+        row = {
+            "currency": f"{transaction.currency}",
+            "amount_bought": f"{transaction.amount_bought:,.2f}",
+            "amount_sold": f"{transaction.amount_sold:,.2f}",
+        }
+        if filters.get("report_currency"):
+            row["value_bought"] = f"{transaction.value_bought:,.2f}"
+            row["value_sold"] = f"{transaction.value_sold:,.2f}"
+
+        data.append(row)
 
     return data
 
@@ -132,8 +163,7 @@ def get_summary_report(filters: dict | None) -> dict:
 
         filter_opts["transaction_type"] = transaction_type
 
-        most_traded_currency = frappe.db.get_all(
-            "Transaction",
+        most_traded_currency = get_all_transactions(
             filters=filter_opts,
             fields=["currency", "SUM(amount) as amount"],
             order_by="amount desc",
@@ -25,5 +25,36 @@ frappe.query_reports["Top Sellers"] = {
 			label: __("To Date"),
 			fieldtype: "Datetime",
 		},
+		{
+			fieldname: "report_currency",
+			label: __("Report Currency"),
+			fieldtype: "Link",
+			options: "FXCurrency",
+		},
 	],
+
+	onload(report) {
+		forex_management.live_reports.subscribe("Top Sellers", {
+			sort_by: "amount_fx",
+			match: (delta) => delta.transaction_type === "Sell",
+			apply(data, delta, filters) {
+				const { add_to_row, convert } = forex_management.live_reports;
+				const increments = { amount_fx: delta.amount, amount_etb: delta.amount_etb };
+				if (filters.report_currency) {
+					increments.amount_report = convert(
+						delta.amount_etb,
+						"ETB",
+						filters.report_currency
+					);
+				}
+				const row = add_to_row(data, "customer", delta.customer_name, increments);
+				row.currency = row.currency || delta.currency;
+				row.exchange_rate = row.exchange_rate || delta.exchange_rate;
+			},
+			get_chart: (data) => ({
+				labels: data.map((row) => row.customer),
+				datasets: [{ name: __("Top Sellers"), values: data.map((row) => row.amount_etb) }],
+			}),
+		});
+	},
 };
@@ -26,7 +26,7 @@ app_license = "mit"
 
 # include js, css files in header of desk.html
 # app_include_css = "/assets/forex_management/css/forex_management.css"
-# app_include_js = "/assets/forex_management/js/forex_management.js"
+app_include_js = "/assets/forex_management/js/live_reports.js"
 
 # include js, css files in header of web template
 # web_include_css = "/assets/forex_management/css/forex_management.css"
@@ -143,23 +143,32 @@ app_license = "mit"
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"forex_management.tasks.all"
-# 	],
-# 	"daily": [
-# 		"forex_management.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"forex_management.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"forex_management.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"forex_management.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+	"cron": {
+		# end of the trading day
+		"55 23 * * *": [
+			"forex_management.valuation.take_position_snapshots",
+		],
+		# close yesterday once the snapshots are taken
+		"10 0 * * *": [
+			"forex_management.period_close.close_trading_days",
+		],
+		# end-of-day report snapshots for week over week comparisons
+		"50 23 * * *": [
+			"forex_management.report_snapshots.take_preset_snapshots",
+		],
+		# recomputes stale report results, throttled in peak counter hours
+		"*/10 * * * *": [
+			"forex_management.report_cache.warm_report_cache",
+		],
+	},
+	"daily_long": [
+		"forex_management.archive.archive_old_transactions",
+	],
+	"weekly_long": [
+		"forex_management.duplicates.cluster_customers",
+	],
+}
 
 # Testing
 # -------
@@ -169,9 +178,11 @@ app_license = "mit"
 # Overriding Methods
 # ------------------------------
 #
-# override_whitelisted_methods = {
-# 	"frappe.desk.doctype.event.event.get_events": "forex_management.event.get_events"
-# }
+override_whitelisted_methods = {
+	# retry Transaction submits from the form and the REST client on lock conflicts
+	"frappe.desk.form.save.savedocs": "forex_management.api.savedocs",
+	"frappe.client.submit": "forex_management.api.submit",
+}
 #
 # each overriding function accepts a `data` argument;
 # generated from the base implementation of the doctype dashboard,
@@ -233,7 +244,8 @@ app_license = "mit"
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
+default_log_clearing_doctypes = {
+	"Transaction Request": 30,  # days to retain idempotency keys
+	"Report Snapshot": 400,
+}
 
@@ -0,0 +1,105 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Import-time benchmark of the modules a worker loads for this app.
+
+Every module named in hooks.py, every DocType controller and every report is
+imported in a fresh interpreter under `python -X importtime`, after Frappe itself,
+so only the time the app adds to worker startup is counted.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import frappe
+
+APP_NAME = "forex_management"
+# milliseconds the app's modules may add on top of an already imported Frappe
+IMPORT_TIME_THRESHOLD = 150
+# imported before the measurement starts, every worker has them loaded anyway
+BASELINE_MODULES = ["frappe", "frappe.model.document", "frappe.utils"]
+# heavy dependencies that must only be imported on first use
+LAZY_MODULES = {"numpy", "arrow", "openpyxl", "xlsxwriter", "turtle", "tkinter"}
+MARKER = "forex_management:import_time"
+
+MEASURE_SCRIPT = f"""
+import importlib, sys
+for module in {BASELINE_MODULES!r}:
+	importlib.import_module(module)
+sys.stderr.write("{MARKER}\\n")
+for module in sys.argv[1:]:
+	importlib.import_module(module)
+"""
+
+
+def get_app_modules() -> list[str]:
+	"""Return the modules referenced by hooks.py plus all DocType and report modules."""
+	modules = set()
+
+	def collect(value):
+		if isinstance(value, dict):
+			for item in value.values():
+				collect(item)
+		elif isinstance(value, list | tuple):
+			for item in value:
+				collect(item)
+		elif isinstance(value, str) and value.startswith(f"{APP_NAME}."):
+			# hooks name functions, import the module that holds them
+			modules.add(value.rpartition(".")[0])
+
+	collect(frappe.get_hooks(app_name=APP_NAME))
+
+	module_path = Path(frappe.get_app_path(APP_NAME, APP_NAME))
+	for folder in ("doctype", "report"):
+		for controller in module_path.glob(f"{folder}/*/*.py"):
+			if controller.stem == controller.parent.name:
+				modules.add(f"{APP_NAME}.{APP_NAME}.{folder}.{controller.parent.name}.{controller.stem}")
+
+	return sorted(modules)
+
+
+def measure_import_time(modules: list[str]) -> dict[str, tuple[int, int]]:
+	"""Return `{module: (self µs, cumulative µs)}` for every module importing `modules` loads."""
+	result = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", MEASURE_SCRIPT, *modules],
+		capture_output=True,
+		text=True,
+		check=True,
+	)
+	_, _, timings = result.stderr.partition(f"{MARKER}\n")
+
+	loaded = {}
+	for line in timings.splitlines():
+		if not line.startswith("import time:") or "[us]" in line:
+			continue
+		self_time, cumulative, module = line.removeprefix("import time:").split("|")
+		loaded[module.strip()] = (int(self_time), int(cumulative))
+
+	return loaded
+
+
+def benchmark(threshold: int = IMPORT_TIME_THRESHOLD, runs: int = 3):
+	"""Print the import time of the app's modules and fail above `threshold` milliseconds.
+
+	Run with `bench --site <site> execute forex_management.import_time.benchmark`. Takes
+	the fastest of `runs` fresh interpreters, and also fails if an import pulls in one
+	of the heavy dependencies that are meant to load lazily.
+	"""
+	modules = get_app_modules()
+	loaded = min(
+		(measure_import_time(modules) for _ in range(int(runs))),
+		key=lambda timings: sum(self_time for self_time, _ in timings.values()),
+	)
+	total = sum(self_time for self_time, _ in loaded.values()) / 1000
+
+	print(f"modules: {len(modules)}, imported: {len(loaded)}")
+	print(f"import time: {total:.1f} ms, threshold: {threshold} ms")
+	for module, (self_time, _) in sorted(loaded.items(), key=lambda item: -item[1][0])[:10]:
+		print(f"{self_time / 1000:8.1f} ms  {module}")
+
+	eager = sorted({module.split(".")[0] for module in loaded} & LAZY_MODULES)
+	if eager:
+		raise AssertionError(f"imported eagerly: {', '.join(eager)}")
+	if total > float(threshold):
+		raise AssertionError(f"import time {total:.1f} ms is above the {threshold} ms threshold")
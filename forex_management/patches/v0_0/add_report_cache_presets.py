@@ -0,0 +1,16 @@
+import frappe
+
+REPORTS = ["Top Buyers", "Top Sellers", "Top Currencies", "Profit & Loss Analysis"]
+PERIODS = ["All Time", "Today", "This Week", "This Month"]
+# reports with a Currency filter
+CURRENCY_REPORTS = ["Top Buyers", "Top Sellers", "Top Currencies"]
+
+
+def execute():
+	if frappe.db.count("Report Cache Preset"):
+		return
+
+	presets = [{"report": report, "period": period} for report in REPORTS for period in PERIODS]
+	presets += [{"report": report, "period": "This Month", "per_currency": 1} for report in CURRENCY_REPORTS]
+	for preset in presets:
+		frappe.get_doc({"doctype": "Report Cache Preset", **preset}).insert(ignore_permissions=True)
@@ -0,0 +1,5 @@
+from forex_management.duplicates import rebuild_match_keys
+
+
+def execute():
+	rebuild_match_keys()
@@ -0,0 +1,5 @@
+from forex_management.period_close import close_trading_days
+
+
+def execute():
+	close_trading_days()
@@ -0,0 +1,5 @@
+from forex_management.valuation import rebuild_positions
+
+
+def execute():
+	rebuild_positions()
@@ -0,0 +1,5 @@
+from forex_management.forex_management.doctype.customer.customer import rebuild_trading_summaries
+
+
+def execute():
+	rebuild_trading_summaries()
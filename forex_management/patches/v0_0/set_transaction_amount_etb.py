@@ -0,0 +1,13 @@
+import frappe
+
+
+def execute():
+	# every transaction saved so far was quoted in ETB
+	for table in ("tabTransaction", "tabTransaction Archive"):
+		frappe.db.sql(
+			f"""
+			update `{table}`
+			set amount_etb = amount * exchange_rate
+			where ifnull(amount_etb, 0) = 0
+			"""
+		)
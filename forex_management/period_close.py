@@ -0,0 +1,291 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""End-of-day close of trading days.
+
+Closing a day freezes its submitted transactions into Trading Day Total rows, one
+per customer, currency pair and transaction type, and records a Trading Day
+Close. The rows use the column names of Transaction (summed amounts, averaged
+rate, `date_and_time` at the start of the day), so a report query written for
+Transaction runs on them unchanged.
+
+`split_closed_days` cuts a report's date range into whole closed days, answered
+from the frozen totals, and the remaining open pieces that still need a scan of
+Transaction. Closed days can no longer change: cancelling one of their trades is
+blocked and a late draft is booked on the open day instead.
+"""
+
+import datetime
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, flt, get_datetime, getdate, now, now_datetime
+
+from forex_management.valuation import store_closing_positions
+
+CLOSED_RANGE_KEY = "forex_management:closed_trading_days"
+TOTAL_GROUP_BY = ["customer", "customer_name", "currency", "quote_currency", "transaction_type"]
+TOTAL_FIELDS = ["trade_count", "amount", "amount_etb", "exchange_rate"]
+
+
+def get_closed_range() -> tuple | None:
+	"""Return `(first closed day, last closed day)`, or None before the first close."""
+	closed_range = frappe.cache.get_value(
+		CLOSED_RANGE_KEY,
+		generator=lambda: frappe.db.get_value(
+			"Trading Day Close", {}, ["min(close_date)", "max(close_date)"]
+		),
+	)
+	if not closed_range or not closed_range[0]:
+		return None
+	return getdate(closed_range[0]), getdate(closed_range[1])
+
+
+def is_day_closed(date_and_time) -> bool:
+	"""Return whether the day of `date_and_time` is closed, waiting for a close in progress.
+
+	Today is never closed. For earlier days the Trading Day Close row is read with a
+	lock: a running close inserts that row before it reads the day's totals, so a
+	submit or cancel either waits for the close to commit and sees the day closed, or
+	holds the close back until it commits and is counted in the totals.
+	"""
+	day = getdate(date_and_time)
+	if day >= getdate():
+		return False
+	return bool(frappe.db.get_value("Trading Day Close", {"close_date": day}, "name", for_update=True))
+
+
+def close_trading_days():
+	"""Close every finished day after the last closed one, oldest first."""
+	closed_range = get_closed_range()
+	if closed_range:
+		day = add_days(closed_range[1], 1)
+	else:
+		first_trade = min(
+			(
+				first
+				for doctype in ("Transaction Archive", "Transaction")
+				if (first := frappe.db.get_value(doctype, {"docstatus": 1}, "min(date_and_time)"))
+			),
+			default=None,
+		)
+		if not first_trade:
+			return
+		day = getdate(first_trade)
+
+	yesterday = add_days(getdate(), -1)
+	while day <= yesterday:
+		close_trading_day(day)
+		frappe.db.commit()
+		day = add_days(day, 1)
+
+
+def close_trading_day(day):
+	day = getdate(day)
+	if frappe.db.exists("Trading Day Close", {"close_date": day}):
+		frappe.throw(_("Trading day {0} is already closed.").format(day))
+
+	# insert the close before reading the totals, see `is_day_closed`
+	close = frappe.get_doc({"doctype": "Trading Day Close", "close_date": day, "closed_at": now_datetime()})
+	close.insert(ignore_permissions=True)
+
+	totals = get_day_totals(day, for_update=True)
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Trading Day Total",
+		fields=["name", "creation", "modified", "owner", "modified_by", "close_date", "date_and_time"]
+		+ TOTAL_GROUP_BY
+		+ TOTAL_FIELDS,
+		values=[
+			(frappe.generate_hash(), timestamp, timestamp, user, user, day, get_datetime(day))
+			+ tuple(row[fieldname] for fieldname in TOTAL_GROUP_BY + TOTAL_FIELDS)
+			for row in totals
+		],
+	)
+	close.db_set(
+		{
+			"trade_count": sum(row.trade_count for row in totals),
+			"turnover_etb": sum(flt(row.amount_etb) for row in totals),
+		},
+		update_modified=False,
+	)
+	store_closing_positions(day)
+	# clearing before the commit would let another worker cache the old range again
+	frappe.db.after_commit.add(lambda: frappe.cache.delete_value(CLOSED_RANGE_KEY))
+
+
+def get_day_totals(day, for_update: bool = False) -> list[frappe._dict]:
+	"""Return the submitted totals of `day`, recomputed from Transaction and Transaction Archive.
+
+	With `for_update` the rows are read with a lock, which sees the latest committed
+	trades rather than the transaction's snapshot.
+	"""
+	filters = [
+		["docstatus", "=", 1],
+		["date_and_time", ">=", get_datetime(day)],
+		["date_and_time", "<", get_datetime(add_days(day, 1))],
+	]
+	totals = {}
+	for doctype in ("Transaction", "Transaction Archive"):
+		for row in frappe.get_all(
+			doctype,
+			filters=filters,
+			fields=[
+				*TOTAL_GROUP_BY,
+				"COUNT(*) as trade_count",
+				"SUM(amount) as amount",
+				"SUM(amount_etb) as amount_etb",
+				"SUM(amount * exchange_rate) as amount_in_quote",
+			],
+			group_by=", ".join(TOTAL_GROUP_BY),
+			for_update=for_update,
+		):
+			key = tuple(row[fieldname] for fieldname in TOTAL_GROUP_BY)
+			if key in totals:
+				for fieldname in ("trade_count", "amount", "amount_etb", "amount_in_quote"):
+					totals[key][fieldname] += row[fieldname]
+			else:
+				totals[key] = row
+
+	for row in totals.values():
+		row.exchange_rate = row.pop("amount_in_quote") / row.amount if row.amount else 0
+
+	return list(totals.values())
+
+
+def split_closed_days(filters: dict) -> tuple[list | None, list[list]]:
+	"""Split Transaction `filters` into a closed-day part and the open parts around it.
+
+	Returns `(closed_filters, open_filters)`: list-style filters for Trading Day Total,
+	or None if no whole closed day is in range, and filters for each remaining range
+	that has to be read from Transaction.
+	"""
+	conditions = [
+		[fieldname, *value] if isinstance(value, list | tuple) else [fieldname, "=", value]
+		for fieldname, value in filters.items()
+		if fieldname != "date_and_time"
+	]
+	lower, upper = get_date_bounds(filters.get("date_and_time"))
+	closed_range = get_closed_range()
+	if not closed_range:
+		return None, [conditions + get_date_conditions(lower, upper)]
+
+	# only whole days can be answered from the totals, partial days at either end
+	# of the range are scanned
+	if lower is None:
+		first_day = closed_range[0]
+	else:
+		first_day = getdate(lower[1])
+		if lower[0] == ">" or get_datetime(lower[1]) != get_datetime(first_day):
+			first_day = add_days(first_day, 1)
+		first_day = max(first_day, closed_range[0])
+
+	last_day = closed_range[1] if upper is None else min(add_days(getdate(upper[1]), -1), closed_range[1])
+
+	if first_day > last_day:
+		return None, [conditions + get_date_conditions(lower, upper)]
+
+	closed_start, closed_end = get_datetime(first_day), get_datetime(add_days(last_day, 1))
+	closed_filters = conditions + get_date_conditions((">=", closed_start), ("<", closed_end))
+
+	open_filters = []
+	if lower is None or get_datetime(lower[1]) < closed_start:
+		open_filters.append(conditions + get_date_conditions(lower, ("<", closed_start)))
+	if upper is None or get_datetime(upper[1]) > closed_end or upper[0] == "<=":
+		open_filters.append(conditions + get_date_conditions((">=", closed_end), upper))
+
+	return closed_filters, open_filters
+
+
+def get_date_bounds(condition) -> tuple:
+	"""Return `((operator, value) | None, (operator, value) | None)` for a date filter."""
+	if not condition:
+		return None, None
+
+	operator, value = condition
+	if operator == "between":
+		from_date, to_date = value
+		# like Frappe, a to date without a time includes that whole day
+		if not isinstance(to_date, datetime.datetime) and " " not in str(to_date):
+			return (">=", from_date), ("<", get_datetime(add_days(getdate(to_date), 1)))
+		return (">=", from_date), ("<=", to_date)
+	if operator in (">", ">="):
+		return (operator, value), None
+	return None, (operator, value)
+
+
+def get_date_conditions(lower: tuple | None, upper: tuple | None) -> list[list]:
+	return [["date_and_time", *bound] for bound in (lower, upper) if bound]
+
+
+def book_late_transaction(doc):
+	"""Move a transaction dated on a closed day to now, as an adjustment of the open day."""
+	if not is_day_closed(doc.date_and_time):
+		return
+
+	frappe.msgprint(
+		_("Trading day {0} is closed, the transaction is booked on {1} instead.").format(
+			getdate(doc.date_and_time), getdate()
+		),
+		alert=True,
+	)
+	doc.date_and_time = now_datetime()
+
+
+def check_cancellation(doc):
+	if is_day_closed(doc.date_and_time):
+		frappe.throw(
+			_("Trading day {0} is closed. Book a reversing transaction instead of cancelling.").format(
+				getdate(doc.date_and_time)
+			),
+			title=_("Trading Day Closed"),
+		)
+
+
+def verify_trading_day_closes(from_date=None, to_date=None) -> list[dict]:
+	"""Compare the frozen totals of closed days with a full recompute and print the differences.
+
+	Run with `bench --site <site> execute forex_management.period_close.verify_trading_day_closes`.
+	"""
+	filters = {}
+	if from_date and to_date:
+		filters["close_date"] = ["between", [from_date, to_date]]
+	elif from_date:
+		filters["close_date"] = [">=", from_date]
+	elif to_date:
+		filters["close_date"] = ["<=", to_date]
+
+	mismatches = []
+	for day in frappe.get_all(
+		"Trading Day Close", filters=filters, pluck="close_date", order_by="close_date"
+	):
+		frozen = {
+			tuple(row[fieldname] for fieldname in TOTAL_GROUP_BY): row
+			for row in frappe.get_all(
+				"Trading Day Total",
+				filters={"close_date": day},
+				fields=TOTAL_GROUP_BY + TOTAL_FIELDS,
+			)
+		}
+		recomputed = {
+			tuple(row[fieldname] for fieldname in TOTAL_GROUP_BY): row for row in get_day_totals(day)
+		}
+
+		for key in frozen.keys() | recomputed.keys():
+			expected, actual = recomputed.get(key, {}), frozen.get(key, {})
+			for fieldname in ("trade_count", "amount", "amount_etb"):
+				if abs(flt(expected.get(fieldname)) - flt(actual.get(fieldname))) > 1e-6:
+					mismatches.append(
+						{
+							"close_date": day,
+							"key": dict(zip(TOTAL_GROUP_BY, key, strict=True)),
+							"field": fieldname,
+							"frozen": actual.get(fieldname),
+							"recomputed": expected.get(fieldname),
+						}
+					)
+
+	for mismatch in mismatches:
+		print(mismatch)
+	print(f"{len(mismatches)} mismatches")
+	return mismatches
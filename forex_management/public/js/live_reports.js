@@ -0,0 +1,106 @@
+// Copyright (c) 2025, Natnael Abrham and contributors
+// For license information, please see license.txt
+
+// Applies batched Transaction deltas published by forex_management.realtime
+// to the rows and chart of an open query report, without re-running it.
+// Amounts in a Report Currency are converted at the rates sent with the deltas.
+
+frappe.provide("forex_management.live_reports");
+
+forex_management.live_reports.handlers = {};
+// ETB per unit of every FXCurrency, null for currencies without a rate
+forex_management.live_reports.etb_rates = { ETB: 1 };
+
+forex_management.live_reports.parse_amount = (value) => flt(String(value || 0).replace(/,/g, ""));
+
+// same output as the server side f"{value:,.2f}"
+forex_management.live_reports.format_amount = (value) =>
+	flt(value).toLocaleString("en-US", { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+
+// same as forex_management.rates.convert, NaN for a currency without a rate
+forex_management.live_reports.convert = (amount, from_currency, to_currency) => {
+	const { etb_rates } = forex_management.live_reports;
+	const from_rate = etb_rates[from_currency || "ETB"];
+	const to_rate = etb_rates[to_currency || "ETB"];
+	if (!from_rate || !to_rate) return NaN;
+	return (flt(amount) * from_rate) / to_rate;
+};
+
+forex_management.live_reports.matches_filters = (delta, filters) => {
+	for (const fieldname of ["customer", "currency", "transaction_type"]) {
+		if (filters[fieldname] && filters[fieldname] !== delta[fieldname]) {
+			return false;
+		}
+	}
+	if (filters.from_date && delta.date_and_time < filters.from_date) {
+		return false;
+	}
+	if (filters.to_date && delta.date_and_time >= filters.to_date) {
+		return false;
+	}
+	return true;
+};
+
+// `handler` is {match(delta, filters), apply(data, delta, filters), get_chart(data), sort_by},
+// where sort_by is a fieldname or a function returning the descending sort key of a row
+forex_management.live_reports.subscribe = (report_name, handler) => {
+	const live_reports = forex_management.live_reports;
+	const is_first_subscriber = !Object.keys(live_reports.handlers).length;
+	live_reports.handlers[report_name] = handler;
+
+	if (is_first_subscriber) {
+		// deltas are published to the Transaction room, joining it checks read permission
+		frappe.realtime.doctype_subscribe("Transaction");
+		frappe.realtime.on("forex_transaction_deltas", (message) => {
+			if (message.rates) {
+				live_reports.etb_rates = message.rates;
+			}
+			live_reports.apply(message.deltas);
+		});
+	}
+};
+
+forex_management.live_reports.apply = (deltas) => {
+	const report = frappe.query_report;
+	if (!report || !report.report_name || !report.data || !report.datatable) return;
+
+	const handler = forex_management.live_reports.handlers[report.report_name];
+	if (!handler) return;
+
+	const filters = report.get_filter_values() || {};
+	let changed = false;
+	for (const delta of deltas) {
+		if (!forex_management.live_reports.matches_filters(delta, filters)) continue;
+		if (handler.match && !handler.match(delta, filters)) continue;
+		handler.apply(report.data, delta, filters);
+		changed = true;
+	}
+	if (!changed) return;
+
+	if (handler.sort_by) {
+		const sort_key =
+			typeof handler.sort_by === "function"
+				? handler.sort_by
+				: (row) => forex_management.live_reports.parse_amount(row[handler.sort_by]);
+		report.data.sort((a, b) => sort_key(b) - sort_key(a));
+	}
+	report.datatable.refresh(report.data);
+	if (report.chart && handler.get_chart) {
+		report.chart.update(handler.get_chart(report.data));
+	}
+};
+
+// upsert a row keyed on `key_field` and add `increments` to its numeric cells
+forex_management.live_reports.add_to_row = (data, key_field, key, increments, formatted = false) => {
+	const { parse_amount, format_amount } = forex_management.live_reports;
+	let row = data.find((d) => d[key_field] === key);
+	if (!row) {
+		row = { [key_field]: key };
+		data.push(row);
+	}
+	for (const [fieldname, increment] of Object.entries(increments)) {
+		const value = parse_amount(row[fieldname]) + increment;
+		row[fieldname] = formatted ? format_amount(value) : value;
+	}
+	return row;
+};
@@ -0,0 +1,118 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Cross rates between all FXCurrencies, built from their latest ETB rates.
+
+`get_rate_matrix` returns a square matrix where `matrix[i, j]` is the units of
+currency j one unit of currency i buys. It is cached until an FXCurrency rate
+changes, and `convert` uses it to convert a whole column of amounts with one
+NumPy operation instead of looking up a rate per row. NumPy is imported on first
+use only, as most workers that load this module never convert anything.
+"""
+
+import math
+from typing import TYPE_CHECKING
+
+import frappe
+from frappe.utils import flt
+
+if TYPE_CHECKING:
+	import numpy as np
+
+HOME_CURRENCY = "ETB"
+RATE_MATRIX_KEY = "forex_management:rate_matrix"
+
+
+def get_rate_matrix() -> tuple[dict[str, int], "np.ndarray"]:
+	"""Return `(index, matrix)`, with `index` mapping FXCurrency names and "ETB" to matrix rows."""
+	return frappe.cache.get_value(RATE_MATRIX_KEY, generator=build_rate_matrix)
+
+
+def build_rate_matrix() -> tuple[dict[str, int], "np.ndarray"]:
+	import numpy as np
+
+	index = {HOME_CURRENCY: 0}
+	etb_rates = [1.0]
+	for currency in frappe.get_all("FXCurrency", fields=["name", "currency_code", "exchange_rate"]):
+		if currency.currency_code == HOME_CURRENCY:
+			index[currency.name] = 0
+			continue
+
+		index[currency.name] = len(etb_rates)
+		# a currency without a rate converts to NaN rather than to a wrong number
+		etb_rates.append(flt(currency.exchange_rate) or np.nan)
+
+	rates = np.array(etb_rates)
+	return index, rates[:, None] / rates[None, :]
+
+
+def clear_rate_matrix():
+	frappe.cache.delete_value(RATE_MATRIX_KEY)
+
+
+def get_cross_rate(from_currency: str, to_currency: str) -> float:
+	"""Return the units of `to_currency` one unit of `from_currency` buys, NaN if unknown."""
+	index, matrix = get_rate_matrix()
+	if from_currency not in index or to_currency not in index:
+		return math.nan
+	return float(matrix[index[from_currency], index[to_currency]])
+
+
+def convert(amounts, from_currencies, to_currency: str) -> "np.ndarray":
+	"""Convert `amounts[i]` from `from_currencies[i]` to `to_currency` at the latest rates.
+
+	`from_currencies` may also be a single currency shared by all amounts. Unknown
+	currencies and currencies without a rate come back as NaN.
+	"""
+	import numpy as np
+
+	amounts = np.asarray(amounts, dtype=float)
+	index, matrix = get_rate_matrix()
+	rates_to_target = matrix[:, index[to_currency]]
+
+	if isinstance(from_currencies, str):
+		return amounts * rates_to_target[index[from_currencies]]
+
+	# look up each distinct currency once, then broadcast the rates back to the rows
+	currencies, row_currency = np.unique(np.asarray(from_currencies, dtype=str), return_inverse=True)
+	currency_rates = np.array([rates_to_target[index[c]] if c in index else np.nan for c in currencies])
+	return amounts * currency_rates[row_currency]
+
+
+def convert_rows(
+	rows: list[dict], amount_field: str, from_currency: str, to_currency: str, target_field: str
+):
+	"""Set `row[target_field]` to `row[amount_field]` converted to `to_currency`, for all rows.
+
+	`from_currency` is either a currency or the fieldname holding each row's currency.
+	"""
+	if not rows:
+		return rows
+
+	if from_currency in rows[0]:
+		from_currency = [row[from_currency] for row in rows]
+
+	converted = convert([row[amount_field] or 0 for row in rows], from_currency, to_currency)
+	for row, value in zip(rows, converted.tolist(), strict=True):
+		row[target_field] = value
+
+	return rows
+
+
+def get_amount_etb(transaction) -> float:
+	"""Return the ETB value of `transaction`, also for rows saved before `amount_etb` existed."""
+	return flt(transaction.get("amount_etb")) or flt(transaction.amount) * flt(transaction.exchange_rate)
+
+
+def get_etb_rates() -> dict[str, float | None]:
+	"""Return the ETB one unit of every FXCurrency buys, None for currencies without a rate."""
+	index, matrix = get_rate_matrix()
+	etb_rates = {currency: float(matrix[row, index[HOME_CURRENCY]]) for currency, row in index.items()}
+	return {currency: None if math.isnan(rate) else rate for currency, rate in etb_rates.items()}
+
+
+def get_currency_code(currency: str | None) -> str:
+	"""Return the code of an FXCurrency name like "United States Dollar (USD)", ETB for none."""
+	if not currency:
+		return HOME_CURRENCY
+	return currency.split("(")[1].replace(")", "")
@@ -0,0 +1,93 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Batched realtime push of submitted Transactions to open report pages.
+
+Every submit/cancel buffers a compact delta in Redis once the DB transaction
+commits. A single flush job per debounce window drains the buffer and
+publishes all pending deltas as one ``forex_transaction_deltas`` message, so a
+burst of trades turns into a handful of socket messages. Each message also carries
+the current ETB rates, for reports that show amounts in a Report Currency.
+"""
+
+import json
+import time
+
+import frappe
+from frappe.utils import flt, now_datetime
+
+from forex_management.rates import get_amount_etb, get_etb_rates
+
+REALTIME_EVENT = "forex_transaction_deltas"
+DELTA_BUFFER_KEY = "forex_management:transaction_deltas"
+FLUSH_LOCK_KEY = "forex_management:transaction_deltas_flush"
+
+# seconds to wait after the first buffered delta before publishing
+PUBLISH_INTERVAL = 0.5
+# lock expiry, so a crashed flush job cannot block publishing for good
+FLUSH_LOCK_TTL = 30
+MAX_DELTAS_PER_MESSAGE = 500
+
+
+def get_transaction_delta(doc, sign: int = 1) -> dict:
+	amount = flt(doc.amount) * sign
+	return {
+		"customer": doc.customer,
+		"customer_name": doc.customer_name,
+		"currency": doc.currency,
+		"quote_currency": doc.quote_currency,
+		"transaction_type": doc.transaction_type,
+		"amount": amount,
+		"exchange_rate": flt(doc.exchange_rate),
+		"amount_etb": get_amount_etb(doc) * sign,
+		"date_and_time": str(doc.date_and_time),
+	}
+
+
+def queue_transaction_delta(doc, sign: int = 1):
+	"""Buffer the delta for `doc` and schedule a flush once the DB commit succeeds."""
+	delta = get_transaction_delta(doc, sign)
+	frappe.db.after_commit.add(lambda: _buffer_delta(delta))
+
+
+def _buffer_delta(delta: dict):
+	frappe.cache.rpush(DELTA_BUFFER_KEY, json.dumps(delta))
+	_schedule_flush()
+
+
+def _schedule_flush():
+	lock_key = frappe.cache.make_key(FLUSH_LOCK_KEY)
+	if frappe.cache.set(lock_key, now_datetime().timestamp(), nx=True, ex=FLUSH_LOCK_TTL):
+		frappe.enqueue("forex_management.realtime.flush_transaction_deltas", queue="short")
+
+
+def flush_transaction_deltas():
+	lock_key = frappe.cache.make_key(FLUSH_LOCK_KEY)
+	scheduled_at = flt(frappe.cache.get(lock_key))
+	if scheduled_at:
+		wait = PUBLISH_INTERVAL - (now_datetime().timestamp() - scheduled_at)
+		if wait > 0:
+			time.sleep(wait)
+
+	while deltas := _drain_deltas():
+		# only to the sessions that may read Transactions, not to every logged in user
+		frappe.publish_realtime(
+			REALTIME_EVENT, {"deltas": deltas, "rates": get_etb_rates()}, doctype="Transaction"
+		)
+
+	frappe.cache.delete(lock_key)
+
+	# a delta buffered between the last drain and the lock release saw the lock
+	# held and did not schedule a flush of its own
+	if frappe.cache.llen(DELTA_BUFFER_KEY):
+		_schedule_flush()
+
+
+def _drain_deltas() -> list[dict]:
+	key = frappe.cache.make_key(DELTA_BUFFER_KEY)
+	with frappe.cache.pipeline() as pipe:
+		pipe.lrange(key, 0, MAX_DELTAS_PER_MESSAGE - 1)
+		pipe.ltrim(key, MAX_DELTAS_PER_MESSAGE, -1)
+		raw_deltas, _ = pipe.execute()
+
+	return [json.loads(delta) for delta in raw_deltas]
@@ -0,0 +1,165 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Precomputed report results for the filter sets in Report Cache Preset.
+
+`warm_report_cache` runs the app's reports for every preset filter set and stores
+the results in Redis, tagged with the version of the data they are computed from.
+A submitted or cancelled Transaction bumps the version of its currency and the one
+of all trades, a rate change bumps every version, so a stale result is never
+served. Results filtered on another currency stay valid. The next warm run
+recomputes stale results, in peak counter hours only once in a while and briefly.
+
+Reports are wrapped in `cached_report`, which returns a stored result when the
+filters match a warmed filter set exactly and runs the report otherwise.
+"""
+
+import functools
+import hashlib
+import json
+import time
+
+import frappe
+from frappe.utils import cint, get_datetime, now_datetime
+
+REPORT_CACHE_KEY = "forex_management:report_cache"
+# hash of version counters: ALL_TRADES, RATES and one per currency
+DATA_VERSION_KEY = "forex_management:report_data_versions"
+ALL_TRADES = "all"
+RATES = "rates"
+PEAK_WARM_KEY = "forex_management:report_cache_peak_warm"
+# a warmed result is dropped after a day, filter sets like "Today" move on anyway
+REPORT_CACHE_TTL = 24 * 60 * 60
+# hours of the day warming is throttled in, override with the `report_cache_peak_hours` site config key
+DEFAULT_PEAK_HOURS = (8, 18)
+# minutes between warm runs in peak hours, `report_cache_peak_warm_interval` in site config, 0 to skip them
+DEFAULT_PEAK_WARM_INTERVAL = 30
+# pause between reports, and the longest a run may take, in and outside of peak hours
+WARM_PAUSE = 0.2
+WARM_MAX_RUNTIME = 9 * 60
+WARM_PEAK_MAX_RUNTIME = 60
+DATE_FILTERS = ("from_date", "to_date")
+
+
+def cached_report(report_name: str):
+	"""Decorator for a report's `execute`, serving warmed results for preset filter sets."""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters: dict | None = None):
+			cached = frappe.cache.get_value(get_cache_key(report_name, filters))
+			if cached and cached["version"] == get_data_version(filters):
+				return cached["result"]
+			return execute(filters)
+
+		return wrapper
+
+	return decorator
+
+
+def get_cache_key(report_name: str, filters: dict | None) -> str:
+	return f"{REPORT_CACHE_KEY}:{frappe.scrub(report_name)}:{get_filters_hash(filters)}"
+
+
+def get_filters_hash(filters: dict | None) -> str:
+	"""Return a hash of `filters` that ignores empty filters and how dates are written."""
+	values = {}
+	for fieldname, value in (filters or {}).items():
+		if value in (None, "", []):
+			continue
+		# the same datetime can arrive as "2025-04-01" or "2025-04-01 00:00:00"
+		values[fieldname] = str(get_datetime(value)) if fieldname in DATE_FILTERS else value
+
+	return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_report_execute(report_name: str):
+	"""Return the `execute` function of one of the app's script reports."""
+	module = frappe.scrub(report_name)
+	return frappe.get_attr(f"forex_management.forex_management.report.{module}.{module}.execute")
+
+
+def get_data_version(filters: dict | None = None) -> tuple[int, ...]:
+	"""Return the versions of the data a result for `filters` is computed from.
+
+	A result filtered on a currency only reads that currency's trades, converted with
+	the current rates; any other result may read every trade.
+	"""
+	currency = filters and filters.get("currency")
+	fields = [RATES, currency] if currency else [ALL_TRADES]
+	key = frappe.cache.make_key(DATA_VERSION_KEY)
+	with frappe.cache.pipeline() as pipe:
+		for field in fields:
+			pipe.hget(key, field)
+		return tuple(int(version or 0) for version in pipe.execute())
+
+
+def expire_report_cache(currencies: list[str] | set[str] | None = None):
+	"""Mark the warmed results a change touches stale once the current DB transaction commits.
+
+	Trades in `currencies` touch the results filtered on one of them and those without
+	a currency filter. Without `currencies`, e.g. for a rate change, every result is stale.
+	"""
+	frappe.db.after_commit.add(functools.partial(bump_data_version, sorted(currencies or ())))
+
+
+def bump_data_version(currencies: list[str] | None = None):
+	key = frappe.cache.make_key(DATA_VERSION_KEY)
+	with frappe.cache.pipeline() as pipe:
+		for field in [ALL_TRADES, *(currencies or [RATES])]:
+			pipe.hincrby(key, field, 1)
+		pipe.execute()
+
+
+def is_peak_hour() -> bool:
+	start, end = frappe.conf.get("report_cache_peak_hours") or DEFAULT_PEAK_HOURS
+	return start <= now_datetime().hour < end
+
+
+def claim_peak_warm() -> bool:
+	"""Return True if no warm run started in peak hours within the peak warm interval."""
+	interval = cint(frappe.conf.get("report_cache_peak_warm_interval", DEFAULT_PEAK_WARM_INTERVAL))
+	if interval <= 0:
+		return False
+	return bool(frappe.cache.set(frappe.cache.make_key(PEAK_WARM_KEY), 1, nx=True, ex=interval * 60))
+
+
+def warm_report_cache():
+	"""Compute every preset filter set whose stored result is missing or stale.
+
+	Runs every few minutes from the scheduler, never longer than `WARM_MAX_RUNTIME`.
+	In peak counter hours it runs once per peak warm interval and stops after
+	`WARM_PEAK_MAX_RUNTIME`, so it does not compete with counter traffic.
+	"""
+	if is_peak_hour() and not claim_peak_warm():
+		return
+
+	started = time.monotonic()
+	for name in frappe.get_all("Report Cache Preset", filters={"enabled": 1}, pluck="name"):
+		preset = frappe.get_doc("Report Cache Preset", name)
+		for filters in preset.get_filter_sets():
+			max_runtime = WARM_PEAK_MAX_RUNTIME if is_peak_hour() else WARM_MAX_RUNTIME
+			if time.monotonic() - started > max_runtime:
+				return
+			if warm_report(preset.report, filters):
+				time.sleep(WARM_PAUSE)
+
+
+def warm_report(report_name: str, filters: dict) -> bool:
+	"""Run `report_name` for `filters` and store the result, unless a current one is stored."""
+	key = get_cache_key(report_name, filters)
+	version = get_data_version(filters)
+	cached = frappe.cache.get_value(key)
+	if cached and cached["version"] == version:
+		return False
+
+	result = get_report_execute(report_name).__wrapped__(frappe._dict(filters))
+
+	# a trade committed while the report ran makes the result stale on arrival
+	if get_data_version(filters) == version:
+		frappe.cache.set_value(
+			key,
+			{"version": version, "result": result, "computed_at": now_datetime()},
+			expires_in_sec=REPORT_CACHE_TTL,
+		)
+	return True
@@ -0,0 +1,323 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Stored report results and the differences between them.
+
+A Report Snapshot keeps one run of a report, keyed by report, filters and as-of
+time. Rows are stored column by column: text columns as a dictionary of distinct
+values plus one integer code per row, number columns as float64 arrays, the whole
+payload zlib compressed, so a week of preset snapshots stays small.
+
+`get_report_diff` compares two snapshots, or a snapshot with the live report, by
+joining their rows on the key columns with sorted NumPy arrays instead of looking
+rows up one by one. A report names its key columns and the number columns worth
+comparing in `SNAPSHOT_KEY_FIELDS` and `SNAPSHOT_NUMBER_FIELDS`; Top Buyers for
+example is one row per customer, so its currency is not part of the key.
+"""
+
+import base64
+import functools
+import json
+import zlib
+
+import frappe
+from frappe import _
+from frappe.utils import get_datetime, now_datetime
+
+from forex_management.report_cache import get_filters_hash, get_report_execute
+
+NUMBER_FIELDTYPES = ("Currency", "Float", "Int", "Percent")
+TEXT_FIELDTYPES = ("Link", "Dynamic Link", "Select")
+
+
+def take_snapshot(report_name: str, filters: dict | None = None) -> str:
+	"""Run `report_name` for `filters` now and store the result as a Report Snapshot."""
+	filters = frappe._dict(filters or {})
+	columns, data = get_report_execute(report_name)(filters)[:2]
+	encoded = encode_result(columns, data, get_diff_fields(report_name)[0])
+
+	return (
+		frappe.get_doc(
+			{
+				"doctype": "Report Snapshot",
+				"report": report_name,
+				"filters": json.dumps(filters, sort_keys=True, default=str),
+				"filters_hash": get_filters_hash(filters),
+				"as_of": now_datetime(),
+				"row_count": len(data),
+				"compressed_size": len(encoded),
+				"data": encoded,
+			}
+		)
+		.insert(ignore_permissions=True)
+		.name
+	)
+
+
+def take_preset_snapshots():
+	"""Snapshot every filter set of the enabled Report Cache Presets, at the end of the day."""
+	for name in frappe.get_all("Report Cache Preset", filters={"enabled": 1}, pluck="name"):
+		preset = frappe.get_doc("Report Cache Preset", name)
+		for filters in preset.get_filter_sets():
+			take_snapshot(preset.report, filters)
+
+
+def get_diff_fields(report_name: str) -> tuple[list[str] | None, list[str] | None]:
+	"""Return the key and number columns `report_name` declares, None for what it leaves out."""
+	module = frappe.scrub(report_name)
+	report = frappe.get_module(f"forex_management.forex_management.report.{module}.{module}")
+	return getattr(report, "SNAPSHOT_KEY_FIELDS", None), getattr(report, "SNAPSHOT_NUMBER_FIELDS", None)
+
+
+def encode_result(columns: list[dict], data: list[dict], key_fields: list[str] | None = None) -> str:
+	"""Encode a report result, `key_fields` are kept as text even if they look like numbers."""
+	import numpy as np
+
+	payload = {"columns": columns, "row_count": len(data), "text": {}, "numbers": {}}
+	for column in columns:
+		fieldname = column["fieldname"]
+		values = [row.get(fieldname) for row in data]
+
+		numbers = None if fieldname in (key_fields or ()) else to_numbers(values, column.get("fieldtype"))
+		if numbers is not None:
+			payload["numbers"][fieldname] = _encode_bytes(numbers.tobytes())
+		else:
+			strings = np.array(["" if value is None else str(value) for value in values], dtype=str)
+			uniques, codes = np.unique(strings, return_inverse=True)
+			payload["text"][fieldname] = {
+				"uniques": uniques.tolist(),
+				"codes": _encode_bytes(codes.astype(np.int32).tobytes()),
+			}
+
+	return base64.b64encode(zlib.compress(json.dumps(payload).encode(), 9)).decode()
+
+
+def decode_result(encoded: str) -> tuple[list[dict], dict]:
+	"""Return `(columns, {fieldname: NumPy array})` of an encoded result."""
+	import numpy as np
+
+	payload = json.loads(zlib.decompress(base64.b64decode(encoded)))
+	arrays = {}
+	for fieldname, values in payload["numbers"].items():
+		arrays[fieldname] = np.frombuffer(base64.b64decode(values), dtype=np.float64)
+	for fieldname, values in payload["text"].items():
+		codes = np.frombuffer(base64.b64decode(values["codes"]), dtype=np.int32)
+		arrays[fieldname] = (
+			np.array(values["uniques"], dtype=str)[codes] if len(codes) else np.array([], dtype=str)
+		)
+
+	return payload["columns"], arrays
+
+
+def to_numbers(values: list, fieldtype: str | None = None):
+	"""Return `values` as a float64 array, None if it is not a number column.
+
+	Reports with "Value" or "Data" columns send formatted numbers like "1,234.50",
+	those count as numbers too.
+	"""
+	import numpy as np
+
+	if fieldtype in TEXT_FIELDTYPES:
+		return None
+	if not values:
+		return np.zeros(0) if fieldtype in (*NUMBER_FIELDTYPES, "Value") else None
+
+	strings = np.array(["" if value is None else str(value) for value in values], dtype=str)
+	strings = np.char.replace(strings, ",", "")
+	strings[np.char.strip(strings) == ""] = "0"
+	try:
+		return strings.astype(np.float64)
+	except ValueError:
+		return None
+
+
+def diff_results(
+	before: tuple[list[dict], dict],
+	after: tuple[list[dict], dict],
+	key_fields: list[str] | None = None,
+	number_fields: list[str] | None = None,
+) -> dict:
+	"""Join two decoded results on `key_fields` and return the change of every one of `number_fields`.
+
+	Without `key_fields` every text column is part of the key, without
+	`number_fields` every number column is compared except rates, which do not add
+	up. Rows with the same key on one side are summed. Each output row holds the key
+	columns, `<field>_before`, `<field>_after` and `<field>_change` per number column,
+	and a status: Added, Removed, Changed or Unchanged.
+	"""
+	import numpy as np
+
+	(before_columns, before_arrays), (after_columns, after_arrays) = before, after
+	# a number column added or dropped between the two runs counts as zero on the other side
+	fieldnames = list(dict.fromkeys(column["fieldname"] for column in after_columns + before_columns))
+	kinds = {
+		fieldname: {
+			arrays[fieldname].dtype.kind for arrays in (before_arrays, after_arrays) if fieldname in arrays
+		}
+		for fieldname in fieldnames
+	}
+	text_fields = [
+		fieldname
+		for fieldname in fieldnames
+		if fieldname in before_arrays and fieldname in after_arrays and kinds[fieldname] == {"U"}
+	]
+	if number_fields is None:
+		number_fields = [fieldname for fieldname in fieldnames if not fieldname.endswith("rate")]
+	number_fields = [fieldname for fieldname in number_fields if kinds.get(fieldname) == {"f"}]
+	key_fields = [fieldname for fieldname in key_fields or () if fieldname in text_fields] or text_fields
+
+	before_keys = _get_row_keys(before_arrays, key_fields)
+	after_keys = _get_row_keys(after_arrays, key_fields)
+	keys = np.union1d(before_keys, after_keys)
+	# position of every row of either side in the sorted union of keys
+	before_index = np.searchsorted(keys, before_keys)
+	after_index = np.searchsorted(keys, after_keys)
+
+	in_before = np.zeros(len(keys), dtype=bool)
+	in_before[before_index] = True
+	in_after = np.zeros(len(keys), dtype=bool)
+	in_after[after_index] = True
+
+	result = {}
+	for fieldname in key_fields:
+		values = np.full(len(keys), "", dtype=object)
+		values[before_index] = before_arrays[fieldname]
+		values[after_index] = after_arrays[fieldname]
+		result[fieldname] = values
+
+	changed = np.zeros(len(keys), dtype=bool)
+	for fieldname in number_fields:
+		before_values = np.zeros(len(keys))
+		np.add.at(before_values, before_index, before_arrays.get(fieldname, 0))
+		after_values = np.zeros(len(keys))
+		np.add.at(after_values, after_index, after_arrays.get(fieldname, 0))
+
+		change = after_values - before_values
+		changed |= ~np.isclose(change, 0)
+		result[f"{fieldname}_before"] = before_values
+		result[f"{fieldname}_after"] = after_values
+		result[f"{fieldname}_change"] = change
+
+	result["status"] = np.select(
+		[in_after & ~in_before, in_before & ~in_after, changed],
+		["Added", "Removed", "Changed"],
+		"Unchanged",
+	)
+
+	# largest change of the first number column first
+	if number_fields:
+		order = np.argsort(-np.abs(result[f"{number_fields[0]}_change"]), kind="stable")
+		result = {fieldname: values[order] for fieldname, values in result.items()}
+
+	return {"key_fields": key_fields, "number_fields": number_fields, "rows": to_rows(result)}
+
+
+def to_rows(arrays: dict) -> list[dict]:
+	fieldnames = list(arrays)
+	columns = [arrays[fieldname].tolist() for fieldname in fieldnames]
+	return [dict(zip(fieldnames, row, strict=True)) for row in zip(*columns, strict=True)]
+
+
+def _get_row_keys(arrays: dict, key_fields: list[str]):
+	import numpy as np
+
+	row_count = len(next(iter(arrays.values()))) if arrays else 0
+	if not key_fields:
+		return np.full(row_count, "", dtype=str)
+	return functools.reduce(
+		lambda keys, values: np.char.add(np.char.add(keys, "\x1f"), values),
+		(arrays[fieldname] for fieldname in key_fields[1:]),
+		arrays[key_fields[0]],
+	)
+
+
+def _encode_bytes(value: bytes) -> str:
+	return base64.b64encode(value).decode()
+
+
+def check_report_permission(report_name: str):
+	report = frappe.get_doc("Report", report_name)
+	if report.module != "Forex Management" or not report.is_permitted():
+		frappe.throw(_("Not permitted to read report {0}").format(report_name), frappe.PermissionError)
+
+
+def get_snapshot_doc(snapshot: str):
+	doc = frappe.get_doc("Report Snapshot", snapshot)
+	check_report_permission(doc.report)
+	return doc
+
+
+def find_snapshot(report_name: str, filters: dict | None = None, as_of=None) -> str | None:
+	"""Return the latest Report Snapshot of `report_name` for `filters` taken at or before `as_of`."""
+	return frappe.db.get_value(
+		"Report Snapshot",
+		{
+			"report": report_name,
+			"filters_hash": get_filters_hash(filters),
+			"as_of": ["<=", get_datetime(as_of) if as_of else now_datetime()],
+		},
+		"name",
+		order_by="as_of desc",
+	)
+
+
+@frappe.whitelist(methods=["POST"])
+def take_report_snapshot(report: str, filters: str | dict | None = None) -> str:
+	check_report_permission(report)
+	return take_snapshot(report, frappe.parse_json(filters) if filters else None)
+
+
+@frappe.whitelist()
+def get_report_snapshot(
+	snapshot: str | None = None,
+	report: str | None = None,
+	filters: str | dict | None = None,
+	as_of: str | None = None,
+) -> dict:
+	"""Return a stored report result, by snapshot name or as of a time for a report and filters."""
+	if not snapshot:
+		check_report_permission(report)
+		snapshot = find_snapshot(report, frappe.parse_json(filters) if filters else None, as_of)
+		if not snapshot:
+			frappe.throw(
+				_("No snapshot of {0} for these filters as of {1}").format(report, as_of or _("now"))
+			)
+
+	doc = get_snapshot_doc(snapshot)
+	columns, arrays = decode_result(doc.data)
+	return {
+		"name": doc.name,
+		"report": doc.report,
+		"filters": json.loads(doc.filters or "{}"),
+		"as_of": doc.as_of,
+		"columns": columns,
+		"data": to_rows({column["fieldname"]: arrays[column["fieldname"]] for column in columns}),
+	}
+
+
+@frappe.whitelist()
+def get_report_diff(snapshot: str, compare_to: str | None = None) -> dict:
+	"""Return the change from `snapshot` to `compare_to`, another snapshot of the same report.
+
+	Without `compare_to` the snapshot is compared with the live report for the same filters.
+	"""
+	doc = get_snapshot_doc(snapshot)
+	before = decode_result(doc.data)
+	key_fields, number_fields = get_diff_fields(doc.report)
+
+	if compare_to:
+		other = get_snapshot_doc(compare_to)
+		if other.report != doc.report:
+			frappe.throw(_("Both snapshots must be of the same report."))
+		after, as_of = decode_result(other.data), other.as_of
+	else:
+		filters = frappe._dict(json.loads(doc.filters or "{}"))
+		columns, data = get_report_execute(doc.report)(filters)[:2]
+		after, as_of = decode_result(encode_result(columns, data, key_fields)), now_datetime()
+
+	return {
+		"report": doc.report,
+		"from": doc.as_of,
+		"to": as_of,
+		**diff_results(before, after, key_fields, number_fields),
+	}
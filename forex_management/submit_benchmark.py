@@ -0,0 +1,208 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Server time per trade of the batch submit endpoint against one submit per trade.
+
+`benchmark` books the same number of trades on a throwaway customer three ways:
+saved and then submitted like the Transaction form does, one trade per
+`submit_transactions` call, and batches of `batch_size` trades per call. The HTTP
+round trip a terminal saves by batching is not part of the numbers.
+
+A batch validates every trade on its own, but writes the trades and their
+idempotency keys with one multi-row INSERT each, updates the trading summaries and
+currency positions once per customer and currency, and commits once, so those
+costs are shared by the whole batch instead of paid per trade.
+
+`stress_test` submits batches from several processes at once against the same
+customers and currencies, and checks no trade is lost or booked twice. Run both on
+a test site, they remove their trades again afterwards.
+"""
+
+import time
+
+import frappe
+from frappe import _
+
+from forex_management.api import submit_transactions
+from forex_management.valuation import rebuild_position, revalue_currency
+from forex_management.velocity import get_counter_key
+
+
+def benchmark(trades: int = 500, batch_size: int = 100):
+	"""Print the milliseconds per trade of each way of submitting `trades` trades.
+
+	Run with `bench --site <site> execute forex_management.submit_benchmark.benchmark`.
+	"""
+	trades, batch_size = int(trades), int(batch_size)
+	currency = frappe.db.get_value("FXCurrency", {"exchange_rate": [">", 0]}, "name")
+	if not currency:
+		frappe.throw(_("The benchmark needs an FXCurrency with an exchange rate."))
+
+	run = frappe.generate_hash(length=6).lower()
+	customer = (
+		frappe.get_doc({"doctype": "Customer", "first_name": f"Benchmark {run}", "last_name": "Submit"})
+		.insert(ignore_permissions=True)
+		.name
+	)
+	frappe.db.commit()
+
+	def get_items(index: int) -> list[dict]:
+		return [
+			{
+				"idempotency_key": f"bench-{run}-{index}-{i}",
+				"customer": customer,
+				"currency": currency,
+				"transaction_type": "Buy" if i % 3 else "Sell",
+				"amount": 100 + i % 7,
+				"exchange_rate": 1,
+			}
+			for i in range(trades)
+		]
+
+	def submit_from_form(items: list[dict]):
+		for item in items:
+			item.pop("idempotency_key")
+			doc = frappe.get_doc({**item, "doctype": "Transaction"}).insert()
+			doc.submit()
+			frappe.db.commit()
+
+	def submit_one_by_one(items: list[dict]):
+		for item in items:
+			submit_transactions([item])
+
+	def submit_in_batches(items: list[dict]):
+		for start in range(0, len(items), batch_size):
+			submit_transactions(items[start : start + batch_size])
+
+	methods = {
+		"form, save + submit": submit_from_form,
+		"batch of 1": submit_one_by_one,
+		f"batch of {batch_size}": submit_in_batches,
+	}
+	try:
+		timings = {}
+		for index, (method, submit) in enumerate(methods.items()):
+			items = get_items(index)
+			start = time.perf_counter()
+			submit(items)
+			timings[method] = (time.perf_counter() - start) * 1000 / trades
+
+		booked = frappe.db.count("Transaction", {"customer": customer, "docstatus": 1})
+		print(f"trades per method: {trades}, booked: {booked}")
+		baseline = timings["form, save + submit"]
+		for method, per_trade in timings.items():
+			print(f"{method:>20}: {per_trade:7.2f} ms per trade, {baseline / per_trade:5.2f}x")
+
+		if booked != trades * len(methods):
+			raise AssertionError(f"{booked} trades booked, expected {trades * len(methods)}")
+	finally:
+		remove_trades([customer], [currency], f"bench-{run}-")
+
+
+def stress_test(workers: int = 8, trades: int = 200, batch_size: int = 20):
+	"""Submit trades from `workers` processes in parallel and check none is lost or booked twice.
+
+	Run with `bench --site <site> execute forex_management.submit_benchmark.stress_test --kwargs "{'workers': 16}"`
+	on a test site: it books real trades on two throwaway customers and two existing
+	currencies, so all workers contend for the same Customer and Currency Position rows,
+	and removes them again afterwards. Every batch is sent twice to check the duplicates.
+	"""
+	import multiprocessing
+
+	currencies = frappe.get_all("FXCurrency", filters={"exchange_rate": [">", 0]}, pluck="name", limit=2)
+	if len(currencies) < 2:
+		frappe.throw(_("The stress test needs two FXCurrencies with an exchange rate."))
+
+	run = frappe.generate_hash(length=6).lower()
+	customers = [
+		frappe.get_doc({"doctype": "Customer", "first_name": f"Stress {run}", "last_name": last_name})
+		.insert(ignore_permissions=True)
+		.name
+		for last_name in ("One", "Two")
+	]
+	frappe.db.commit()
+
+	jobs = [
+		(
+			frappe.local.site,
+			frappe.local.sites_path,
+			run,
+			worker,
+			int(trades),
+			int(batch_size),
+			customers,
+			currencies,
+		)
+		for worker in range(int(workers))
+	]
+	try:
+		start = time.perf_counter()
+		with multiprocessing.get_context("spawn").Pool(int(workers)) as pool:
+			results = [
+				result for worker_results in pool.starmap(_stress_worker, jobs) for result in worker_results
+			]
+		elapsed = time.perf_counter() - start
+
+		expected = int(workers) * int(trades)
+		submitted = [result for result in results if result["status"] == "Submitted"]
+		failed = [result for result in results if result["status"] == "Failed"]
+		booked = frappe.db.count("Transaction", {"customer": ["in", customers], "docstatus": 1})
+		trade_count = sum(
+			frappe.get_all("Customer", filters={"name": ["in", customers]}, pluck="trade_count")
+		)
+
+		print(f"workers: {workers}, trades: {expected}, batch size: {batch_size}")
+		print(f"elapsed: {elapsed:.2f} s, throughput: {expected / elapsed:,.0f} trades/s")
+		print(f"submitted: {len(submitted)}, failed: {len(failed)}, booked: {booked}")
+
+		if failed:
+			raise AssertionError(f"{len(failed)} trades failed, first error: {failed[0]['error']}")
+		if len(submitted) != expected or len({result["name"] for result in submitted}) != expected:
+			raise AssertionError(f"{len(submitted)} trades submitted, expected {expected} distinct trades")
+		if booked != expected or trade_count != expected:
+			raise AssertionError(f"{booked} trades booked and {trade_count} counted, expected {expected}")
+	finally:
+		remove_trades(customers, currencies, f"stress-{run}-")
+
+
+def _stress_worker(site, sites_path, run, worker, trades, batch_size, customers, currencies) -> list[dict]:
+	frappe.init(site=site, sites_path=sites_path)
+	frappe.connect()
+	frappe.set_user("Administrator")
+	try:
+		results = []
+		for start in range(0, trades, batch_size):
+			batch = [
+				{
+					"idempotency_key": f"stress-{run}-{worker}-{i}",
+					"customer": customers[i % len(customers)],
+					"currency": currencies[i % len(currencies)],
+					"transaction_type": "Buy" if i % 3 else "Sell",
+					"amount": 100 + i % 7,
+					"exchange_rate": 1,
+				}
+				for i in range(start, min(start + batch_size, trades))
+			]
+			results += submit_transactions([item.copy() for item in batch])
+			# the resend must not book anything
+			for result in submit_transactions(batch):
+				if result["status"] != "Duplicate":
+					raise AssertionError(f"resent {result['idempotency_key']} came back {result['status']}")
+		return results
+	finally:
+		frappe.destroy()
+
+
+def remove_trades(customers: list[str], currencies: list[str], key_prefix: str):
+	"""Delete the trades, alerts and idempotency keys of throwaway `customers` and the customers."""
+	frappe.db.rollback()
+	frappe.db.delete("Transaction Request", {"name": ["like", f"{key_prefix}%"]})
+	frappe.db.delete("Transaction Alert", {"customer": ["in", customers]})
+	frappe.db.delete("Transaction", {"customer": ["in", customers]})
+	frappe.db.delete("Customer Trading Summary", {"customer": ["in", customers]})
+	frappe.db.delete("Customer", {"name": ["in", customers]})
+	frappe.cache.delete(*(get_counter_key(customer) for customer in customers))
+	for currency in currencies:
+		rebuild_position(currency)
+		revalue_currency(currency)
+	frappe.db.commit()
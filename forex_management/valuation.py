@@ -0,0 +1,304 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Net currency positions of the desk and their mark-to-market valuation.
+
+A Buy adds to the desk's position in the traded currency, a Sell takes from it;
+a cross trade also moves the quote currency the other way. Each Currency
+Position keeps its average ETB cost and realized P&L, updated on every submit.
+
+The valuation of each position at the latest FXCurrency rate is kept in a Redis
+hash and recomputed only for the currency whose position or rate changed, so
+`get_valuation` is a cache read.
+"""
+
+import math
+from collections import defaultdict
+
+import frappe
+from frappe.utils import add_days, flt, get_datetime, getdate, now_datetime
+
+from forex_management.rates import HOME_CURRENCY, get_amount_etb, get_cross_rate
+
+VALUATION_KEY = "forex_management:valuation"
+# positions smaller than this are treated as flat
+POSITION_PRECISION = 1e-9
+
+
+def get_legs(transaction, sign: int = 1) -> list[tuple[str, float, float]]:
+	"""Return `(currency, signed quantity, ETB rate)` for each currency `transaction` moves."""
+	amount = flt(transaction.amount)
+	amount_etb = get_amount_etb(transaction)
+	if not amount or not amount_etb:
+		return []
+
+	direction = sign if transaction.transaction_type == "Buy" else -sign
+	legs = [(transaction.currency, direction * amount, amount_etb / amount)]
+
+	if transaction.quote_currency:
+		quote_amount = amount * flt(transaction.exchange_rate)
+		legs.append((transaction.quote_currency, -direction * quote_amount, amount_etb / quote_amount))
+
+	# always lock positions in the same order, so two cross trades cannot deadlock
+	return sorted(legs)
+
+
+def apply_trade(position: float, average_cost: float, quantity: float, rate: float) -> tuple:
+	"""Return `(position, average_cost, realized_pnl)` after trading `quantity` units at `rate`.
+
+	Uses average cost: adding to a position blends the cost, reducing it realizes
+	P&L against the average cost, and flipping it starts a new cost at `rate`.
+	"""
+	if abs(position) < POSITION_PRECISION or (position > 0) == (quantity > 0):
+		new_position = position + quantity
+		return new_position, (position * average_cost + quantity * rate) / new_position, 0.0
+
+	closed = min(abs(quantity), abs(position)) * (1 if position > 0 else -1)
+	realized = closed * (rate - average_cost)
+	new_position = position + quantity
+
+	if abs(new_position) < POSITION_PRECISION:
+		return 0.0, 0.0, realized
+	if (new_position > 0) != (position > 0):
+		return new_position, rate, realized
+	return new_position, average_cost, realized
+
+
+def update_positions(transactions: list):
+	"""Apply submitted `transactions` to the Currency Positions they move, one write per currency."""
+	legs = defaultdict(list)
+	for transaction in transactions:
+		for currency, quantity, rate in get_legs(transaction):
+			legs[currency].append((quantity, rate))
+
+	# always lock positions in the same order, so two submits cannot deadlock
+	for currency in sorted(legs):
+		position = get_position_for_update(currency)
+		new_position, average_cost = flt(position.position), flt(position.average_cost)
+		realized_pnl = flt(position.realized_pnl_etb)
+		for quantity, rate in legs[currency]:
+			new_position, average_cost, realized = apply_trade(new_position, average_cost, quantity, rate)
+			realized_pnl += realized
+
+		frappe.db.set_value(
+			"Currency Position",
+			currency,
+			{"position": new_position, "average_cost": average_cost, "realized_pnl_etb": realized_pnl},
+			update_modified=False,
+		)
+		revalue_after_commit(currency)
+
+
+def reverse_positions(transaction):
+	"""Rebuild the positions a cancelled `transaction` moved.
+
+	Average cost is path dependent, so the trade cannot simply be subtracted; the
+	positions are replayed from the remaining submitted trades instead. The replay
+	starts from the closing position of the last closed day, whose trades can no
+	longer be cancelled, so only the open days are read under the position lock.
+	"""
+	for currency, _quantity, _rate in get_legs(transaction, sign=-1):
+		get_position_for_update(currency)
+		rebuild_position(currency, from_last_close=True)
+		revalue_after_commit(currency)
+
+
+def get_position_for_update(currency: str) -> frappe._dict:
+	# create a missing position before locking it: a locking read of a missing row takes
+	# a gap lock, and two submits that both do so and then insert deadlock on each other
+	if not frappe.db.exists("Currency Position", currency):
+		frappe.get_doc({"doctype": "Currency Position", "currency": currency}).insert(
+			ignore_permissions=True, ignore_if_duplicate=True
+		)
+
+	return frappe.db.get_value(
+		"Currency Position",
+		currency,
+		["position", "average_cost", "realized_pnl_etb"],
+		as_dict=True,
+		for_update=True,
+	)
+
+
+def rebuild_position(currency: str, from_last_close: bool = False):
+	frappe.db.set_value(
+		"Currency Position",
+		currency,
+		replay_position(currency, from_last_close=from_last_close),
+		update_modified=False,
+	)
+
+
+def replay_position(
+	currency: str, until=None, from_last_close: bool = False, for_update: bool = False
+) -> dict:
+	"""Return the position in `currency` after replaying its submitted trades dated before `until`.
+
+	With `from_last_close` the replay starts from the closing position of the last
+	closed day before `until`, and only the trades after that day are read.
+	"""
+	position, average_cost, realized_pnl = 0.0, 0.0, 0.0
+	filters = [["docstatus", "=", 1]]
+	if until:
+		filters.append(["date_and_time", "<", get_datetime(until)])
+	if from_last_close and (closing := get_closing_position(currency, before=until)):
+		position, average_cost = flt(closing.position), flt(closing.average_cost)
+		realized_pnl = flt(closing.realized_pnl_etb)
+		filters.append(["date_and_time", ">=", get_datetime(add_days(closing.snapshot_date, 1))])
+
+	for doctype in ("Transaction Archive", "Transaction"):
+		transactions = frappe.get_all(
+			doctype,
+			filters=filters,
+			or_filters=[["currency", "=", currency], ["quote_currency", "=", currency]],
+			fields=[
+				"currency",
+				"quote_currency",
+				"transaction_type",
+				"amount",
+				"exchange_rate",
+				"amount_etb",
+			],
+			order_by="date_and_time asc",
+			for_update=for_update,
+		)
+		for transaction in transactions:
+			for leg_currency, quantity, rate in get_legs(transaction):
+				if leg_currency == currency:
+					position, average_cost, realized = apply_trade(position, average_cost, quantity, rate)
+					realized_pnl += realized
+
+	return {"position": position, "average_cost": average_cost, "realized_pnl_etb": realized_pnl}
+
+
+def get_closing_position(currency: str, before=None) -> frappe._dict | None:
+	"""Return the latest closing Position Snapshot of `currency`, dated before the day of `before`."""
+	filters = {"currency": currency, "is_closing": 1}
+	if before:
+		filters["snapshot_date"] = ["<", getdate(before)]
+	return frappe.db.get_value(
+		"Position Snapshot",
+		filters,
+		["snapshot_date", "position", "average_cost", "realized_pnl_etb"],
+		as_dict=True,
+		order_by="snapshot_date desc",
+	)
+
+
+def store_closing_positions(day):
+	"""Store the position of every currency at the end of the closed `day` as closing Position Snapshots.
+
+	Called by the close of `day`, after which its trades can no longer change, so the
+	closing position is final and later replays start from it. The valuation snapshot
+	of the day, taken before the last trades of the day, is corrected to it.
+	"""
+	day = getdate(day)
+	for currency in frappe.get_all("Currency Position", pluck="name"):
+		closing = replay_position(currency, until=add_days(day, 1), from_last_close=True, for_update=True)
+		snapshot = frappe.db.get_value(
+			"Position Snapshot",
+			{"currency": currency, "snapshot_date": day},
+			["name", "market_rate"],
+			as_dict=True,
+		)
+		if not snapshot:
+			frappe.get_doc(
+				{
+					"doctype": "Position Snapshot",
+					"currency": currency,
+					"snapshot_date": day,
+					"is_closing": 1,
+					**closing,
+				}
+			).insert(ignore_permissions=True)
+			continue
+
+		if snapshot.market_rate:
+			closing.update(
+				market_value_etb=closing["position"] * snapshot.market_rate,
+				unrealized_pnl_etb=closing["position"] * (snapshot.market_rate - closing["average_cost"]),
+			)
+		frappe.db.set_value("Position Snapshot", snapshot.name, {**closing, "is_closing": 1})
+
+
+def rebuild_positions():
+	"""Replay all submitted transactions into fresh Currency Positions."""
+	frappe.db.delete("Currency Position")
+	frappe.cache.delete_value(VALUATION_KEY)
+	for currency in frappe.get_all("FXCurrency", pluck="name"):
+		get_position_for_update(currency)
+		rebuild_position(currency)
+		revalue_currency(currency)
+
+
+def revalue_after_commit(currency: str):
+	frappe.db.after_commit.add(lambda: revalue_currency(currency))
+
+
+def revalue_currency(currency: str):
+	"""Mark the position in `currency` to the latest rate and store it in the valuation cache."""
+	position = frappe.db.get_value(
+		"Currency Position",
+		currency,
+		["position", "average_cost", "realized_pnl_etb"],
+		as_dict=True,
+	)
+	if not position:
+		frappe.cache.hdel(VALUATION_KEY, currency)
+		return
+
+	valuation = {
+		"position": position.position,
+		"average_cost": position.average_cost,
+		"market_rate": None,
+		"market_value_etb": None,
+		"unrealized_pnl_etb": None,
+		"realized_pnl_etb": position.realized_pnl_etb,
+		"valued_at": str(now_datetime()),
+	}
+
+	market_rate = get_cross_rate(currency, HOME_CURRENCY)
+	# a currency without a rate keeps its position but cannot be marked to market
+	if not math.isnan(market_rate):
+		valuation.update(
+			market_rate=market_rate,
+			market_value_etb=position.position * market_rate,
+			unrealized_pnl_etb=position.position * (market_rate - position.average_cost),
+		)
+
+	frappe.cache.hset(VALUATION_KEY, currency, valuation)
+
+
+@frappe.whitelist()
+def get_valuation() -> dict:
+	"""Return the cached mark-to-market valuation of every open position, keyed by currency."""
+	frappe.has_permission("Currency Position", throw=True)
+	return get_cached_valuation()
+
+
+def get_cached_valuation() -> dict:
+	valuation = frappe.cache.hgetall(VALUATION_KEY)
+	if not valuation:
+		# the cache was flushed, value every position once to fill it again
+		for currency in frappe.get_all("Currency Position", pluck="name"):
+			revalue_currency(currency)
+		valuation = frappe.cache.hgetall(VALUATION_KEY)
+
+	return valuation
+
+
+def take_position_snapshots():
+	"""Store today's closing valuation of every position as Position Snapshots."""
+	snapshot_date = getdate()
+	for currency, valuation in get_cached_valuation().items():
+		if frappe.db.exists("Position Snapshot", {"currency": currency, "snapshot_date": snapshot_date}):
+			continue
+
+		frappe.get_doc(
+			{
+				"doctype": "Position Snapshot",
+				"currency": currency,
+				"snapshot_date": snapshot_date,
+				**{key: value for key, value in valuation.items() if key != "valued_at"},
+			}
+		).insert(ignore_permissions=True)
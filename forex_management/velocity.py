@@ -0,0 +1,287 @@
+# Copyright (c) 2025, Natnael Abrham and contributors
+# For license information, please see license.txt
+
+"""Per-customer sliding-window trade counters for Transaction Alert Rules.
+
+Counters live in one Redis hash per customer, with a field per
+(hour bucket, transaction type, currency). A rule window of N hours sums the
+last N buckets, so checking a trade touches a bounded number of fields no
+matter how much history the customer has. Windows slide in whole hours.
+
+A customer's hash is seeded from the database on first use (e.g. after a Redis
+flush), and expires once it has seen no trades for longer than the widest window.
+"""
+
+import math
+import statistics
+import time
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, flt, get_datetime, now_datetime
+
+from forex_management.rates import get_amount_etb
+
+BUCKET_SECONDS = 3600
+MAX_WINDOW_HOURS = 24 * 7
+COUNTER_KEY = "forex_management:velocity:{}"
+RULES_CACHE_KEY = "forex_management:velocity_rules"
+SEEDED_FIELD = "seeded"
+
+
+def get_active_rules() -> list[dict]:
+	return frappe.cache.get_value(RULES_CACHE_KEY, generator=_get_active_rules)
+
+
+def _get_active_rules():
+	return frappe.get_all(
+		"Transaction Alert Rule",
+		filters={"enabled": 1},
+		fields=[
+			"name",
+			"transaction_type",
+			"currency",
+			"window_hours",
+			"threshold_etb",
+			"max_trades",
+			"action",
+		],
+	)
+
+
+def clear_rules_cache():
+	frappe.cache.delete_value(RULES_CACHE_KEY)
+
+
+def check_transaction(doc, batch: list | None = None):
+	"""Block `doc` if it would push its customer over a blocking rule."""
+	for rule, volume, count in evaluate_rules(doc, action="Block", batch=batch):
+		frappe.throw(
+			_("Transaction blocked by rule {0}: {1} ETB in {2} trades within {3} hours.").format(
+				frappe.bold(rule.name), f"{volume:,.2f}", count, rule.window_hours
+			),
+			title=_("Velocity Limit Exceeded"),
+		)
+
+
+def flag_transaction(doc, batch: list | None = None):
+	"""Record an alert for every flagging rule `doc` crosses."""
+	for rule, volume, count in evaluate_rules(doc, action="Flag", batch=batch):
+		frappe.get_doc(
+			{
+				"doctype": "Transaction Alert",
+				"rule": rule.name,
+				"customer": doc.customer,
+				"transaction": doc.name,
+				"window_hours": rule.window_hours,
+				"volume_etb": volume,
+				"trade_count": count,
+			}
+		).insert(ignore_permissions=True)
+
+
+def evaluate_rules(
+	doc, action: str | None = None, rules: list[dict] | None = None, batch: list | None = None
+) -> list[tuple]:
+	"""Return `(rule, volume_etb, trade_count)` for each rule `doc` crosses, counting `doc` itself.
+
+	`batch` holds the trades submitted with `doc` in one DB transaction, in order. They
+	reach the counters only when it commits, so the ones before `doc` are added here.
+	"""
+	if rules is None:
+		rules = get_active_rules()
+
+	rules = [
+		rule
+		for rule in rules
+		if (not action or rule.action == action)
+		and rule.transaction_type in (None, "", doc.transaction_type)
+		and rule.currency in (None, "", doc.currency)
+	]
+	if not rules:
+		return []
+
+	batch = batch or []
+	# `doc` and its batch are counted below; on submit their rows are already written
+	# with docstatus 1
+	counters = get_counters(doc.customer, exclude=[doc.name, *(other.name for other in batch)])
+	position = next((i for i, other in enumerate(batch) if other is doc), len(batch))
+	for other in batch[:position]:
+		if other.customer == doc.customer:
+			counter = counters[(get_bucket(other.date_and_time), other.transaction_type, other.currency)]
+			counter[0] += get_amount_etb(other)
+			counter[1] += 1
+
+	current_bucket = get_bucket(now_datetime())
+
+	breaches = []
+	for rule in rules:
+		first_bucket = current_bucket - math.ceil(flt(rule.window_hours)) + 1
+		volume = get_amount_etb(doc)
+		count = 1
+
+		for (bucket, transaction_type, currency), (amount_etb, trades) in counters.items():
+			if (
+				bucket >= first_bucket
+				and rule.transaction_type in (None, "", transaction_type)
+				and rule.currency in (None, "", currency)
+			):
+				volume += amount_etb
+				count += trades
+
+		if (rule.threshold_etb and volume > rule.threshold_etb) or (
+			rule.max_trades and count > rule.max_trades
+		):
+			breaches.append((rule, volume, count))
+
+	return breaches
+
+
+def record_transaction(doc, sign: int = 1):
+	"""Add `doc` to its customer's counters once the DB commit succeeds. `sign=-1` removes it."""
+	frappe.db.after_commit.add(lambda: increment_counters(doc, sign))
+
+
+def increment_counters(doc, sign: int = 1):
+	key = get_counter_key(doc.customer)
+	field = f"{get_bucket(doc.date_and_time)}|{doc.transaction_type}|{doc.currency}"
+	with frappe.cache.pipeline() as pipe:
+		pipe.hincrbyfloat(key, f"{field}|amount", get_amount_etb(doc) * sign)
+		pipe.hincrby(key, f"{field}|count", sign)
+		pipe.expire(key, (MAX_WINDOW_HOURS + 1) * BUCKET_SECONDS)
+		pipe.execute()
+
+
+def get_counters(customer: str, exclude: list[str] | None = None) -> dict[tuple, list]:
+	"""Return `{(bucket, transaction_type, currency): [amount_etb, trade_count]}` for `customer`.
+
+	If the counters have to be seeded, the Transactions in `exclude` are left out: they
+	are the trades being checked, and their own counters are added when they commit.
+	"""
+	key = get_counter_key(customer)
+	# RedisWrapper.hgetall unpickles values, the counters are plain redis numbers
+	with frappe.cache.pipeline() as pipe:
+		pipe.hgetall(key)
+		(raw_counters,) = pipe.execute()
+
+	# a trade recorded after a flush or expiry recreates the hash without the marker,
+	# so a hash with counters can still be missing the history before them
+	if SEEDED_FIELD not in {frappe.safe_decode(field) for field in raw_counters}:
+		raw_counters = seed_counters(customer, exclude=exclude)
+
+	oldest_bucket = get_bucket(now_datetime()) - MAX_WINDOW_HOURS
+	counters = defaultdict(lambda: [0.0, 0])
+	stale_fields = []
+	for field, value in raw_counters.items():
+		field = frappe.safe_decode(field)
+		if field == SEEDED_FIELD:
+			continue
+
+		bucket, transaction_type, currency, measure = field.split("|")
+		if int(bucket) < oldest_bucket:
+			stale_fields.append(field)
+			continue
+
+		if measure == "amount":
+			counters[(int(bucket), transaction_type, currency)][0] = flt(value)
+		else:
+			counters[(int(bucket), transaction_type, currency)][1] = int(value)
+
+	if stale_fields:
+		with frappe.cache.pipeline() as pipe:
+			pipe.hdel(key, *stale_fields)
+			pipe.execute()
+
+	return counters
+
+
+def seed_counters(customer: str, exclude: list[str] | None = None) -> dict:
+	"""Load the widest window of `customer`'s submitted trades into Redis, replacing its counters."""
+	key = get_counter_key(customer)
+	filters = {
+		"customer": customer,
+		"docstatus": 1,
+		"date_and_time": [">=", add_to_date(now_datetime(), hours=-MAX_WINDOW_HOURS)],
+	}
+	if exclude := [name for name in exclude or [] if name]:
+		filters["name"] = ["not in", exclude]
+
+	transactions = frappe.get_all(
+		"Transaction",
+		filters=filters,
+		fields=["transaction_type", "currency", "date_and_time", "amount", "exchange_rate", "amount_etb"],
+	)
+
+	fields = defaultdict(int)
+	for transaction in transactions:
+		field = (
+			f"{get_bucket(transaction.date_and_time)}|{transaction.transaction_type}|{transaction.currency}"
+		)
+		fields[f"{field}|amount"] += get_amount_etb(transaction)
+		fields[f"{field}|count"] += 1
+	fields[SEEDED_FIELD] = 1
+
+	# counters written before the seed are already part of the submitted trades
+	with frappe.cache.pipeline() as pipe:
+		pipe.delete(key)
+		pipe.hset(key, mapping=fields)
+		pipe.expire(key, (MAX_WINDOW_HOURS + 1) * BUCKET_SECONDS)
+		pipe.execute()
+
+	return fields
+
+
+def get_counter_key(customer: str) -> str:
+	return frappe.cache.make_key(COUNTER_KEY.format(customer))
+
+
+def get_bucket(date_and_time) -> int:
+	return int(get_datetime(date_and_time).timestamp()) // BUCKET_SECONDS
+
+
+def benchmark(trades: int = 1000):
+	"""Print the latency rule evaluation and counter updates add to a submit.
+
+	Run with `bench --site <site> execute forex_management.velocity.benchmark --kwargs "{'trades': 5000}"`.
+	Uses a throwaway customer key and in-memory rules, so no documents are written.
+	"""
+	customer = f"__velocity_benchmark_{frappe.generate_hash(length=8)}"
+	rules = [
+		frappe._dict(
+			name=f"Benchmark {window}h",
+			transaction_type=transaction_type,
+			currency=None,
+			window_hours=window,
+			threshold_etb=10_000_000,
+			max_trades=100_000,
+			action="Flag",
+		)
+		for window in (1, 24, 24 * 7)
+		for transaction_type in ("Buy", "Sell")
+	]
+	doc = frappe._dict(
+		customer=customer,
+		currency="United States Dollar (USD)",
+		amount=100,
+		exchange_rate=136.5,
+		date_and_time=now_datetime(),
+	)
+
+	key = get_counter_key(customer)
+	timings = []
+	try:
+		for i in range(int(trades)):
+			doc.transaction_type = "Buy" if i % 2 else "Sell"
+			start = time.perf_counter()
+			evaluate_rules(doc, rules=rules)
+			increment_counters(doc)
+			timings.append(time.perf_counter() - start)
+	finally:
+		frappe.cache.delete(key)
+
+	timings.sort()
+	print(f"trades: {len(timings)}, rules: {len(rules)}")
+	print(f"mean: {statistics.mean(timings) * 1000:.3f} ms")
+	print(f"p99: {timings[int(len(timings) * 0.99) - 1] * 1000:.3f} ms")
+	print(f"throughput: {len(timings) / sum(timings):,.0f} checks/s")